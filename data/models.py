@@ -1,59 +1,86 @@
 import os
 from dataclasses import dataclass, field
-from typing import Dict, List, Set, Optional
+from functools import cached_property
+from typing import Callable, Dict, FrozenSet, List, Set, Optional, Tuple
 
 
 DEFAULT_EXCLUDES = [
     "venv", "code_source", "archive", ".env", ".venv", ".git", "__pycache__", ".python-version", "dist", "build", "main.spec"
 ]
+_DEFAULT_EXCLUDES_FSET: FrozenSet[str] = frozenset(DEFAULT_EXCLUDES)
 
 
-@dataclass
+@dataclass(frozen=True)
 class ProjectPaths:
     """
     Utility class for managing all important file and directory paths for a project.
     Provides properties for code source, exclusion file, context files, and versioned JSONs.
+    Paths only depend on root, so they are computed once and cached.
     """
     root: str
+    _versioned: Dict[str, str] = field(default_factory=dict, init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        # Calcule tous les chemins fixes dès la construction : chaque accès
+        # ultérieur n'est plus qu'une lecture dans le __dict__ de l'instance.
+        for name in self._FIXED_PATHS:
+            getattr(self, name)
 
-    @property
+    @cached_property
     def code_source(self) -> str:
         """Return the path to the code_source directory."""
         return os.path.join(self.root, "code_source")
 
-    @property
+    @cached_property
     def exclude_file(self) -> str:
         """Return the path to the exclusion rules file."""
         return os.path.join(self.code_source, "exclude.txt")
 
+    def _versioned_path(self, prefix: str, version: str, ext: str = "json") -> str:
+        """Return (and memoize) the path to code_source/<prefix>.<version>.<ext>."""
+        name = f"{prefix}.{version}.{ext}"
+        path = self._versioned.get(name)
+        if path is None:
+            path = self._versioned[name] = os.path.join(self.code_source, name)
+        return path
+
     def organisation_json(self, version: str) -> str:
         """Return the path to the organisation JSON for a given version."""
-        return os.path.join(self.code_source, f"organisation.{version}.json")
+        return self._versioned_path("organisation", version)
 
     def files_content_json(self, version: str) -> str:
         """Return the path to the files content JSON for a given version."""
-        return os.path.join(self.code_source, f"files_content.{version}.json")
+        return self._versioned_path("files_content", version)
+
+    def files_content_msgpack(self, version: str) -> str:
+        """Return the path to the MessagePack files content for a given version."""
+        return self._versioned_path("files_content", version, "msgpack")
 
-    @property
+    @cached_property
     def context_md(self) -> str:
         """Return the path to the main context Markdown file."""
         return os.path.join(self.code_source, "context.md")
 
-    @property
+    @cached_property
     def context_html(self) -> str:
         """Return the path to the main context HTML file."""
         return os.path.join(self.code_source, "context.html")
 
-    @property
+    @cached_property
     def selected_context_md(self) -> str:
         """Return the path to the selected context Markdown file."""
         return os.path.join(self.code_source, "selected_context.md")
 
-    @property
+    @cached_property
     def selected_context_html(self) -> str:
         """Return the path to the selected context HTML file."""
         return os.path.join(self.code_source, "selected_context.html")
 
+    _FIXED_PATHS = (
+        "code_source", "exclude_file", "context_md", "context_html",
+        "selected_context_md", "selected_context_html",
+    )
+
 
 @dataclass
 class FileEntry:
@@ -80,13 +107,40 @@ class ExclusionRules:
     """
     Manages default and custom exclusion rules for files and folders.
     Used to determine which files/folders should be ignored during project scans.
+    The rules are compiled once into an exact-match set and prefix tuples indexed
+    by first character (a one-level prefix trie); call invalidate() after mutating
+    defaults or custom.
     """
-    defaults: Set[str] = field(default_factory=lambda: set(DEFAULT_EXCLUDES))
+    defaults: FrozenSet[str] = _DEFAULT_EXCLUDES_FSET
     custom: Set[str] = field(default_factory=set)
+    _all: Optional[FrozenSet[str]] = field(default=None, init=False, repr=False, compare=False)
+    _exact: Optional[FrozenSet[str]] = field(default=None, init=False, repr=False, compare=False)
+    _prefixes: Dict[str, Tuple[str, ...]] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _match_all: bool = field(default=False, init=False, repr=False, compare=False)
 
-    def all(self) -> Set[str]:
+    def all(self) -> FrozenSet[str]:
         """Return the union of default and custom exclusion rules."""
-        return self.defaults.union(self.custom)
+        if self._all is None:
+            self._all = frozenset(self.defaults | self.custom)
+        return self._all
+
+    def invalidate(self) -> None:
+        """Drop the cached union and compiled matcher so they are rebuilt on the next check."""
+        self._all = None
+        self._exact = None
+        self._prefixes = {}
+        self._match_all = False
+
+    def _compile(self) -> None:
+        """Compile the current rules into an exact-match set and per-first-character prefix tuples."""
+        rules = self.all()
+        by_first: Dict[str, List[str]] = {}
+        for rule in rules:
+            by_first.setdefault(rule[:1], []).append(rule)
+        self._exact = rules
+        self._prefixes = {first: tuple(group) for first, group in by_first.items() if first}
+        # Une règle vide est préfixe de tout nom
+        self._match_all = "" in rules
 
     def should_exclude(self, name: str) -> bool:
         """
@@ -96,7 +150,34 @@ class ExclusionRules:
         Returns:
             True if excluded, False otherwise.
         """
-        for ex in self.all():
-            if name == ex or name.startswith(ex):
-                return True
-        return False
+        if self._exact is None:
+            self._compile()
+        if name in self._exact or self._match_all:
+            return True
+        # Seules les règles commençant par la même lettre peuvent être préfixes du nom ;
+        # str.startswith accepte un tuple : un seul appel C pour toutes ces règles
+        prefixes = self._prefixes.get(name[:1])
+        return prefixes is not None and name.startswith(prefixes)
+
+    def matcher(self) -> Callable[[str], bool]:
+        """
+        Return a should_exclude equivalent memoized per name, for bulk checks such as a project scan.
+        The matcher is bound to the current rules: build a new one after changing them.
+        Returns:
+            A function mapping a file or folder name to True if it is excluded.
+        """
+        if self._exact is None:
+            self._compile()
+        # Les mêmes noms reviennent dans tous les dossiers (__init__.py, README.md...) :
+        # un seul dict.get suffit après la première rencontre
+        results: Dict[str, bool] = {}
+        get = results.get
+        check = self.should_exclude
+
+        def is_excluded(name: str) -> bool:
+            excluded = get(name)
+            if excluded is None:
+                excluded = results[name] = check(name)
+            return excluded
+
+        return is_excluded
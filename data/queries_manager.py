@@ -1,6 +1,21 @@
-import json
+import atexit
+import functools
 import os
-from typing import Dict, List, Optional, Any
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Any
+
+from .utils import load_json, save_json
+
+
+def _locked(method: Callable) -> Callable:
+    """Run a QueriesManager method while holding the instance lock."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
 
 
 class QueriesManager:
@@ -12,11 +27,13 @@ class QueriesManager:
     Provides methods for CRUD operations on categories, queries, and versions.
     """
 
-    def __init__(self, base_dir: Optional[str] = None):
+    def __init__(self, base_dir: Optional[str] = None, autosave_delay: Optional[float] = None):
         """
         Initialize the QueriesManager, loading categories and queries from disk.
         Args:
             base_dir: Optional base directory for data files. Defaults to the directory of this file.
+            autosave_delay: If set, saves are done by a background thread, coalescing the
+                mutations made within this many seconds. Otherwise saves are synchronous.
         """
         if base_dir is None:
             data_dir = os.path.dirname(os.path.abspath(__file__))  # .../data
@@ -32,25 +49,152 @@ class QueriesManager:
         self.categories: List[str] = []
         self.queries: List[Dict[str, Any]] = []
 
+        # Index nom -> requête et nom -> {numéro -> version} (hors JSON)
+        self._queries_by_name: Dict[str, Dict[str, Any]] = {}
+        self._versions_by_query: Dict[str, Dict[str, Dict[str, Any]]] = {}
+
+        # Listes de noms mémorisées pour les lectures répétées de l'interface,
+        # invalidées par les mutations qui les concernent
+        self._query_names: Optional[List[str]] = None
+        self._version_names: Dict[str, List[str]] = {}
+
+        # Écritures différées : fichiers à réécrire et profondeur de batch()
+        self._dirty_categories = False
+        self._dirty_queries = False
+        self._batch_depth = 0
+
+        # Sauvegarde en arrière-plan (optionnelle)
+        self._lock = threading.RLock()
+        self._autosave_delay = autosave_delay
+        self._save_requested = threading.Event()
+        if autosave_delay is not None:
+            threading.Thread(target=self._writer_loop, name="QueriesManager-writer", daemon=True).start()
+            atexit.register(self.flush)
+
         self.load_all()
 
     # ------------------------------------------------------------------ #
     # Chargement / sauvegarde
     # ------------------------------------------------------------------ #
 
+    @_locked
     def load_all(self) -> None:
         """
         Load categories and queries from their respective JSON files.
         """
         self.categories = self._load_categories(self.categories_path)
         self.queries = self._load_queries(self.queries_path)
+        self._normalize_queries()
+        self._rebuild_index()
+
+    def _normalize_queries(self) -> None:
+        """
+        Backfill the keys every query/version must carry, so lookups can index them directly.
+        """
+        for q in self.queries:
+            q.setdefault("name", "")
+            for v in q.setdefault("versions", []):
+                v.setdefault("version", "")
+
+    def _rebuild_index(self) -> None:
+        """
+        Rebuild the name -> query and name -> version lookup tables from self.queries.
+        The first occurrence wins, matching the previous linear-scan behaviour.
+        """
+        # Tables construites à part puis publiées d'un bloc : un lecteur ne voit jamais un index à moitié rempli
+        queries_by_name: Dict[str, Dict[str, Any]] = {}
+        versions_by_query: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for q in self.queries:
+            name = q["name"]
+            if name in queries_by_name:
+                continue
+            queries_by_name[name] = q
+            versions_by_query[name] = self._index_versions(q)
+        self._queries_by_name = queries_by_name
+        self._versions_by_query = versions_by_query
+        self._query_names = None
+        self._version_names = {}
 
+    @staticmethod
+    def _index_versions(query: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """
+        Build the version number -> version dictionary table for a query.
+        """
+        vmap: Dict[str, Dict[str, Any]] = {}
+        for v in query["versions"]:
+            vmap.setdefault(v["version"], v)
+        return vmap
+
+    @_locked
     def save_all(self) -> None:
         """
         Save categories and queries to their respective JSON files.
         """
         self._save_categories(self.categories_path, self.categories)
         self._save_queries(self.queries_path, self.queries)
+        self._dirty_categories = False
+        self._dirty_queries = False
+
+    @_locked
+    def flush(self) -> None:
+        """
+        Write to disk only the files modified since the last save.
+        """
+        if self._dirty_categories:
+            self._save_categories(self.categories_path, self.categories)
+            self._dirty_categories = False
+        if self._dirty_queries:
+            self._save_queries(self.queries_path, self.queries)
+            self._dirty_queries = False
+
+    @contextmanager
+    def batch(self) -> Iterator["QueriesManager"]:
+        """
+        Defer saving until the outermost batch() block exits.
+        Usage:
+            with manager.batch():
+                manager.add_query(...)
+                manager.add_version(...)
+        """
+        with self._lock:
+            self._batch_depth += 1
+            try:
+                yield self
+            finally:
+                self._batch_depth -= 1
+                if self._batch_depth == 0 and (self._dirty_categories or self._dirty_queries):
+                    self._mark_dirty()
+
+    def _mark_dirty(self, categories: bool = False, queries: bool = False) -> None:
+        """
+        Flag the given files as modified and save them (now, or via the background
+        writer when autosave is enabled) unless inside a batch() block.
+        """
+        self._dirty_categories = self._dirty_categories or categories
+        self._dirty_queries = self._dirty_queries or queries
+        if self._batch_depth > 0:
+            return
+        if self._autosave_delay is None:
+            self.flush()
+        else:
+            self._save_requested.set()
+
+    def _writer_loop(self) -> None:
+        """
+        Background thread body: wait for a save request, let further mutations
+        accumulate for autosave_delay seconds, then flush once.
+        A failed save keeps the dirty flags: it is retried on the next save request
+        (and at exit), instead of killing the thread.
+        """
+        while True:
+            self._save_requested.wait()
+            time.sleep(self._autosave_delay)
+            self._save_requested.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                # Ex. fichier verrouillé un instant sous Windows (os.replace)
+                print("Erreur sauvegarde des requêtes:", e)
 
     def _load_categories(self, path: str) -> List[str]:
         """
@@ -62,8 +206,7 @@ class QueriesManager:
         """
         if not os.path.exists(path):
             return []
-        with open(path, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        data = load_json(path)
         if isinstance(data, dict) and "categories" in data:
             return list(data["categories"])
         if isinstance(data, list):
@@ -77,9 +220,7 @@ class QueriesManager:
             path: Path to the categories JSON file.
             categories: List of category strings to save.
         """
-        os.makedirs(os.path.dirname(path), exist_ok=True)
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump({"categories": categories}, f, indent=4, ensure_ascii=False)
+        self._write_json(path, {"categories": categories})
 
     def _load_queries(self, path: str) -> List[Dict[str, Any]]:
         """
@@ -91,8 +232,7 @@ class QueriesManager:
         """
         if not os.path.exists(path):
             return []
-        with open(path, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        data = load_json(path)
         if isinstance(data, dict) and "queries" in data:
             return list(data["queries"])
         if isinstance(data, list):
@@ -106,9 +246,20 @@ class QueriesManager:
             path: Path to the queries JSON file.
             queries: List of query dictionaries to save.
         """
-        os.makedirs(os.path.dirname(path), exist_ok=True)
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump({"queries": queries}, f, indent=4, ensure_ascii=False)
+        self._write_json(path, {"queries": queries})
+
+    @staticmethod
+    def _write_json(path: str, payload: Dict[str, Any]) -> None:
+        """
+        Atomically write payload as indented JSON, creating the parent directory if needed.
+        Args:
+            path: Destination JSON file.
+            payload: Data to serialize.
+        """
+        parent = os.path.dirname(path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        save_json(path, payload, atomic=True)
 
     # ------------------------------------------------------------------ #
     # Catégories (liste de valeurs possibles)
@@ -120,6 +271,7 @@ class QueriesManager:
         """
         return list(self.categories)
 
+    @_locked
     def add_category(self, name: str) -> None:
         """
         Add a new category if it does not already exist.
@@ -128,8 +280,9 @@ class QueriesManager:
         """
         if name and name not in self.categories:
             self.categories.append(name)
-            self.save_all()
+            self._mark_dirty(categories=True)
 
+    @_locked
     def delete_category(self, name: str) -> None:
         """
         Delete a category by name.
@@ -138,8 +291,9 @@ class QueriesManager:
         """
         if name in self.categories:
             self.categories.remove(name)
-            self.save_all()
+            self._mark_dirty(categories=True)
 
+    @_locked
     def rename_category(self, old: str, new: str) -> None:
         """
         Rename an existing category.
@@ -150,18 +304,51 @@ class QueriesManager:
         if old in self.categories and new:
             idx = self.categories.index(old)
             self.categories[idx] = new
-            self.save_all()
+            self._mark_dirty(categories=True)
+
+    def import_categories(self, path: str) -> None:
+        """
+        Merge the categories of a JSON file (same format as categories.json) into the current list.
+        The file is parsed before taking the lock, so readers are not blocked during the parse.
+        Args:
+            path: JSON file to import.
+        """
+        imported = self._load_categories(path)
+        with self._lock:
+            known = set(self.categories)
+            added = False
+            for name in imported:
+                if name and name not in known:
+                    self.categories.append(name)
+                    known.add(name)
+                    added = True
+            if added:
+                self._mark_dirty(categories=True)
+
+    @_locked
+    def export_categories(self, path: str) -> None:
+        """
+        Write the categories to a JSON file, in the same format as categories.json.
+        Args:
+            path: Destination JSON file.
+        """
+        self._save_categories(path, self.categories)
 
     # ------------------------------------------------------------------ #
     # Requêtes
     # ------------------------------------------------------------------ #
 
+    @_locked
     def get_all_query_names(self) -> List[str]:
         """
         Return a list of all query names.
         """
-        return [q.get("name", "") for q in self.queries]
+        # Sous verrou : une mutation d'un autre thread ne peut pas laisser un mémo périmé
+        if self._query_names is None:
+            self._query_names = [q["name"] for q in self.queries]
+        return list(self._query_names)
 
+    @_locked
     def get_query(self, name: str) -> Optional[Dict[str, Any]]:
         """
         Get a query dictionary by name.
@@ -170,11 +357,9 @@ class QueriesManager:
         Returns:
             The query dictionary, or None if not found.
         """
-        for q in self.queries:
-            if q.get("name") == name:
-                return q
-        return None
+        return self._queries_by_name.get(name)
 
+    @_locked
     def add_query(self, name: str) -> None:
         """
         Add a new query with the given name if it does not already exist.
@@ -185,28 +370,33 @@ class QueriesManager:
             return
         if self.get_query(name) is not None:
             return
-        self.queries.append(
-            {
-                "name": name,
-                "description": "",
-                "category": "",
-                "context_files": "",
-                "versions": [],
-            }
-        )
-        self.save_all()
+        q = {
+            "name": name,
+            "description": "",
+            "category": "",
+            "context_files": "",
+            "versions": [],
+        }
+        self.queries.append(q)
+        self._queries_by_name[name] = q
+        self._versions_by_query[name] = {}
+        self._query_names = None
+        self._mark_dirty(queries=True)
 
+    @_locked
     def delete_query(self, name: str) -> None:
         """
         Delete a query by name.
         Args:
             name: Name of the query to delete.
         """
-        before = len(self.queries)
-        self.queries = [q for q in self.queries if q.get("name") != name]
-        if len(self.queries) != before:
-            self.save_all()
+        if name not in self._queries_by_name:
+            return
+        self.queries = [q for q in self.queries if q["name"] != name]
+        self._rebuild_index()
+        self._mark_dirty(queries=True)
 
+    @_locked
     def update_query_fields(
         self,
         old_name: str,
@@ -231,12 +421,51 @@ class QueriesManager:
         q["category"] = category or ""
         q["description"] = description or ""
         q["context_files"] = context_files or ""
-        self.save_all()
+        if q["name"] != old_name:
+            self._rebuild_index()
+        self._mark_dirty(queries=True)
+
+    def import_queries(self, path: str) -> None:
+        """
+        Merge the queries of a JSON file (same format as queries.json) into the current list.
+        An imported query replaces the existing query of the same name; others are appended.
+        The file is parsed before taking the lock, so readers are not blocked during the parse.
+        Args:
+            path: JSON file to import.
+        """
+        imported = [q for q in self._load_queries(path) if isinstance(q, dict) and q.get("name")]
+        if not imported:
+            return
+        with self._lock:
+            positions: Dict[str, int] = {}
+            for i, q in enumerate(self.queries):
+                positions.setdefault(q["name"], i)
+            for q in imported:
+                for v in q.setdefault("versions", []):
+                    v.setdefault("version", "")
+                i = positions.get(q["name"])
+                if i is None:
+                    positions[q["name"]] = len(self.queries)
+                    self.queries.append(q)
+                else:
+                    self.queries[i] = q
+            self._rebuild_index()
+            self._mark_dirty(queries=True)
+
+    @_locked
+    def export_queries(self, path: str) -> None:
+        """
+        Write all queries to a JSON file, in the same format as queries.json.
+        Args:
+            path: Destination JSON file.
+        """
+        self._save_queries(path, self.queries)
 
     # ------------------------------------------------------------------ #
     # Versions
     # ------------------------------------------------------------------ #
 
+    @_locked
     def get_versions_for_query(self, query_name: str) -> List[str]:
         """
         Get a list of version numbers for a given query.
@@ -245,11 +474,15 @@ class QueriesManager:
         Returns:
             List of version strings.
         """
-        q = self.get_query(query_name)
-        if not q:
-            return []
-        return [v.get("version", "") for v in q.get("versions", [])]
+        names = self._version_names.get(query_name)
+        if names is None:
+            q = self.get_query(query_name)
+            if not q:
+                return []
+            names = self._version_names[query_name] = [v["version"] for v in q["versions"]]
+        return list(names)
 
+    @_locked
     def get_version(self, query_name: str, version_number: str) -> Optional[Dict[str, Any]]:
         """
         Get a version dictionary for a given query and version number.
@@ -259,14 +492,12 @@ class QueriesManager:
         Returns:
             The version dictionary, or None if not found.
         """
-        q = self.get_query(query_name)
-        if not q:
+        vmap = self._versions_by_query.get(query_name)
+        if vmap is None:
             return None
-        for v in q.get("versions", []):
-            if v.get("version") == version_number:
-                return v
-        return None
+        return vmap.get(version_number)
 
+    @_locked
     def add_version(self, query_name: str, version_number: str) -> None:
         """
         Add a new version to a query if it does not already exist.
@@ -277,19 +508,20 @@ class QueriesManager:
         q = self.get_query(query_name)
         if not q or not version_number:
             return
-        versions = q.setdefault("versions", [])
-        for v in versions:
-            if v.get("version") == version_number:
-                return
-        versions.append(
-            {
-                "version": version_number,
-                "before": "",
-                "after": "",
-            }
-        )
-        self.save_all()
+        vmap = self._versions_by_query.setdefault(query_name, {})
+        if version_number in vmap:
+            return
+        v = {
+            "version": version_number,
+            "before": "",
+            "after": "",
+        }
+        q.setdefault("versions", []).append(v)
+        vmap[version_number] = v
+        self._version_names.pop(query_name, None)
+        self._mark_dirty(queries=True)
 
+    @_locked
     def delete_version(self, query_name: str, version_number: str) -> None:
         """
         Delete a version from a query by version number.
@@ -300,12 +532,15 @@ class QueriesManager:
         q = self.get_query(query_name)
         if not q:
             return
-        versions = q.get("versions", [])
-        new_versions = [v for v in versions if v.get("version") != version_number]
+        versions = q["versions"]
+        new_versions = [v for v in versions if v["version"] != version_number]
         if len(new_versions) != len(versions):
             q["versions"] = new_versions
-            self.save_all()
+            self._versions_by_query[query_name] = self._index_versions(q)
+            self._version_names.pop(query_name, None)
+            self._mark_dirty(queries=True)
 
+    @_locked
     def update_version(
         self,
         query_name: str,
@@ -326,11 +561,13 @@ class QueriesManager:
         q = self.get_query(query_name)
         if not q:
             return
-        versions = q.setdefault("versions", [])
-        for v in versions:
-            if v.get("version") == old_version:
-                v["version"] = new_version or old_version
-                v["before"] = before or ""
-                v["after"] = after or ""
-                self.save_all()
-                return
+        v = self.get_version(query_name, old_version)
+        if v is None:
+            return
+        v["version"] = new_version or old_version
+        v["before"] = before or ""
+        v["after"] = after or ""
+        if v["version"] != old_version:
+            self._versions_by_query[query_name] = self._index_versions(q)
+            self._version_names.pop(query_name, None)
+        self._mark_dirty(queries=True)
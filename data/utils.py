@@ -1,132 +1,329 @@
+import io
+import mmap
+import operator
 import os
+import re
 import json
-from typing import Dict, List, Tuple
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, TextIO, Tuple
 from .models import ProjectSnapshot
 
+try:
+    import orjson
+except ImportError:  # orjson est optionnel : repli sur json de la stdlib
+    orjson = None
 
-def load_json(path: str) -> Dict:
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+try:
+    import msgpack
+except ImportError:  # msgpack est optionnel : les snapshots restent en JSON
+    msgpack = None
 
+try:
+    import lz4.frame
+except ImportError:  # lz4 est optionnel : pas de compression
+    lz4 = None
 
-def save_json(path: str, data: Dict) -> None:
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=4, ensure_ascii=False)
+LZ4_SUFFIX = ".lz4"
+
+
+def lz4_enabled() -> bool:
+    """Compression des snapshots activée via la variable d'environnement LZ4_ENABLED."""
+    return lz4 is not None and os.environ.get("LZ4_ENABLED", "") not in ("", "0")
+
+
+def _read_bytes(path: str) -> bytes:
+    with open(path, "rb") as f:
+        raw = f.read()
+    if path.endswith(LZ4_SUFFIX):
+        raw = lz4.frame.decompress(raw)
+    return raw
+
+
+def _write_bytes(path: str, raw: bytes, compress: bool = False) -> None:
+    if compress:
+        raw = lz4.frame.compress(raw, compression_level=1)
+    with open(path, "wb") as f:
+        f.write(raw)
+
+
+# Au-delà de cette taille, le JSON est parsé directement depuis un mmap
+_MMAP_THRESHOLD = 16 * 1024 * 1024
+
+
+def load_json(path: str) -> Any:
+    if orjson is None:
+        # Lecture binaire en une fois : json.loads décode l'UTF-8 d'un bloc
+        with open(path, "rb") as f:
+            return json.loads(f.read())
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size > _MMAP_THRESHOLD:
+            # Pas de copie intermédiaire en mémoire : orjson lit les pages mappées
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                with memoryview(mm) as view:
+                    return orjson.loads(view)
+        return orjson.loads(f.read())
+
+
+def save_json(path: str, data: Any, pretty: bool = True, atomic: bool = False) -> None:
+    # pretty=False : JSON compact, pour les fichiers que seul l'outil relit
+    # atomic=True : écrit dans <path>.tmp puis remplace path, jamais de fichier à moitié écrit
+    if orjson is None:
+        # json.dumps puis une seule écriture binaire : json.dump écrirait fragment par fragment
+        if pretty:
+            text = json.dumps(data, indent=2, ensure_ascii=False)
+        else:
+            text = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+        raw = text.encode("utf-8")
+    else:
+        raw = orjson.dumps(data, option=orjson.OPT_INDENT_2 if pretty else 0)
+    target = path + ".tmp" if atomic else path
+    with open(target, "wb") as f:
+        f.write(raw)
+    if atomic:
+        os.replace(target, path)
+
+
+# Tampon d'écriture des JSON volumineux écrits entrée par entrée
+_JSON_STREAM_BUFFERING = 1 << 20
+
+
+def save_json_stream(path: str, data: Dict[str, Any]) -> None:
+    # JSON compact écrit entrée par entrée : le document encodé complet n'existe
+    # jamais en mémoire (contenu des fichiers d'un snapshot). Même sortie que
+    # save_json(pretty=False).
+    if orjson is None:
+        save_json(path, data, pretty=False)
+        return
+    dumps = orjson.dumps
+    with open(path, "wb", buffering=_JSON_STREAM_BUFFERING) as f:
+        write = f.write
+        sep = b"{"
+        for key, value in data.items():
+            write(sep)
+            write(dumps(key))
+            write(b":")
+            write(dumps(value))
+            sep = b","
+        write(b"}" if sep == b"," else b"{}")
+
+
+def load_json_compressed(path: str) -> Dict:
+    return json.loads(_read_bytes(path).decode("utf-8"))
+
+
+def save_json_compressed(path: str, data: Dict) -> None:
+    _write_bytes(path, json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8"), compress=True)
+
+
+def load_msgpack(path: str) -> Dict:
+    return msgpack.unpackb(_read_bytes(path), raw=False)
+
+
+def save_msgpack(path: str, data: Dict, compress: bool = False) -> None:
+    _write_bytes(path, msgpack.packb(data, use_bin_type=True), compress)
+
+
+_VERSION_RE = re.compile(r"organisation\.(.+)\.json")
+
+
+def _iter_versions(code_source_dir: str) -> Iterator[str]:
+    try:
+        it = os.scandir(code_source_dir)
+    except (FileNotFoundError, NotADirectoryError):
+        return
+    match = _VERSION_RE.fullmatch
+    with it:
+        for entry in it:
+            m = match(entry.name)
+            if m is not None and entry.is_file():
+                yield m.group(1)
+
+
+# code_source_dir -> (st_mtime_ns du dossier, versions triées)
+_VERSIONS_CACHE: Dict[str, Tuple[int, List[str]]] = {}
+
+
+def invalidate_versions_cache(code_source_dir: str) -> None:
+    _VERSIONS_CACHE.pop(code_source_dir, None)
 
 
 def list_existing_versions(code_source_dir: str) -> List[str]:
-    if not os.path.isdir(code_source_dir):
+    # Le mtime du dossier change à chaque création/suppression d'entrée :
+    # tant qu'il est identique, la liste en cache est toujours valable.
+    try:
+        mtime = os.stat(code_source_dir).st_mtime_ns
+    except OSError:
         return []
-    versions = set()
-    for name in os.listdir(code_source_dir):
-        if name.startswith("organisation.") and name.endswith(".json"):
-            middle = name[len("organisation."):-len(".json")]
-            versions.add(middle)
-    return sorted(versions)
+    cached = _VERSIONS_CACHE.get(code_source_dir)
+    if cached is not None and cached[0] == mtime:
+        return list(cached[1])
+    versions = list(_iter_versions(code_source_dir))
+    versions.sort()
+    _VERSIONS_CACHE[code_source_dir] = (mtime, versions)
+    return list(versions)
 
 
-def get_next_version_number(code_source_dir: str) -> str:
-    versions = list_existing_versions(code_source_dir)
-    if not versions:
-        return "001"
-    last = max(int(v) for v in versions)
-    return f"{last + 1:03d}"
+def get_next_version_number(code_source_dir: str, versions: Optional[List[str]] = None) -> str:
+    # Un seul parcours, sans tri : seul le maximum numérique compte.
+    # Une liste déjà obtenue via list_existing_versions évite un second scan.
+    best = -1
+    for v in versions if versions is not None else _iter_versions(code_source_dir):
+        try:
+            n = int(v)
+        except ValueError:
+            continue
+        if n > best:
+            best = n
+    return f"{best + 1:03d}" if best >= 0 else "001"
 
 
 def delete_version_files(code_source_dir: str, version: str) -> None:
     org = os.path.join(code_source_dir, f"organisation.{version}.json")
     fc = os.path.join(code_source_dir, f"files_content.{version}.json")
-    for path in (org, fc):
+    fc_mp = os.path.join(code_source_dir, f"files_content.{version}.msgpack")
+    for path in (org, fc, fc_mp, fc + LZ4_SUFFIX, fc_mp + LZ4_SUFFIX):
         if os.path.exists(path):
             os.remove(path)
+    invalidate_versions_cache(code_source_dir)
+
+
+# Gabarits des exports, construits une seule fois à l'import
+_MD_HEADER = "# Organisation du projet\n\n"
+_MD_FOLDER = "## {folder}\n**Dossiers :**\n{dirs}\n**Fichiers :**\n{files}\n---\n".format
+_MD_FILES_HEADER = "\n# Contenu des fichiers\n\n"
+_MD_FILE = "## {path}\n\n```code\n{text}\n```\n\n".format
+
+_HTML_HEADER = (
+    "<!DOCTYPE html>\n<html>\n<head><meta charset='utf-8'><title>Context</title></head>\n<body>\n"
+    "<h1>Organisation du projet</h1>"
+)
+_HTML_FOLDER = "\n<h2>{folder}</h2>\n<h3>Dossiers :</h3><ul>{dirs}\n</ul>\n<h3>Fichiers :</h3><ul>{files}\n</ul><hr>".format
+_HTML_FILES_HEADER = "\n<h1>Contenu des fichiers</h1>"
+_HTML_FILE = "\n<h2>{path}</h2>\n<pre>\n{text}\n</pre>".format
+_HTML_FOOTER = "\n</body></html>"
+
+
+# Listes rendues par un seul join sur un séparateur constant : aucun formatage par élément
+def _md_items(items: List[str]) -> str:
+    return "- " + "\n- ".join(items) + "\n" if items else ""
+
 
+def _html_items(items: List[str]) -> str:
+    return "\n<li>" + "</li>\n<li>".join(items) + "</li>" if items else ""
 
-def generate_markdown(snapshot: ProjectSnapshot) -> str:
-    md = "# Organisation du projet\n\n"
+
+def _render_markdown(write: Callable[[str], Any], snapshot: ProjectSnapshot) -> None:
+    write(_MD_HEADER)
     for folder, content in snapshot.organisation.items():
-        md += f"## {folder}\n"
-        md += "**Dossiers :**\n"
-        for d in content.get("dirs", []):
-            md += f"- {d}\n"
-        md += "\n**Fichiers :**\n"
-        for f in content.get("files", []):
-            md += f"- {f}\n"
-        md += "\n---\n"
-
-    md += "\n# Contenu des fichiers\n\n"
+        write(_MD_FOLDER(
+            folder=folder,
+            dirs=_md_items(content.get("dirs", [])),
+            files=_md_items(content.get("files", [])),
+        ))
+
+    write(_MD_FILES_HEADER)
     for filepath, text in snapshot.files_content.items():
-        md += f"## {filepath}\n\n"
+        # 🔥 Échapper les backticks pour Notion (replace évité si absent)
+        safe_text = text.replace("```", "`` `") if "```" in text else text
+        write(_MD_FILE(path=filepath, text=safe_text))
 
-        # 🔥 Échapper les backticks pour Notion
-        safe_text = text.replace("```", "`` `")
 
-        md += "```code\n"
-        md += safe_text
-        md += "\n```\n\n"
+def _render_html(write: Callable[[str], Any], snapshot: ProjectSnapshot) -> None:
+    write(_HTML_HEADER)
 
-    return md
+    for folder, content in snapshot.organisation.items():
+        write(_HTML_FOLDER(
+            folder=folder,
+            dirs=_html_items(content.get("dirs", [])),
+            files=_html_items(content.get("files", [])),
+        ))
 
+    write(_HTML_FILES_HEADER)
+    for filepath, text in snapshot.files_content.items():
+        write(_HTML_FILE(path=filepath, text=text))
 
+    write(_HTML_FOOTER)
 
-def generate_html(snapshot: ProjectSnapshot) -> str:
+
+def generate_markdown(snapshot: ProjectSnapshot, out: Optional[TextIO] = None) -> Optional[str]:
+    """
+    Render the snapshot as Markdown.
+    If out is given, the document is written to it and None is returned;
+    otherwise the document is returned as a string.
+    """
+    if out is not None:
+        _render_markdown(out.write, snapshot)
+        return None
+    buf = io.StringIO()
+    _render_markdown(buf.write, snapshot)
+    return buf.getvalue()
+
+
+def generate_html(snapshot: ProjectSnapshot, out: Optional[TextIO] = None) -> Optional[str]:
     """
     Version adaptée à Copilot :
     - HTML simple, non échappé
     - structure proche du Markdown
     - lisible comme un document texte dans Edge
+    Écrit dans out si fourni (et renvoie None), sinon renvoie le document.
     """
-    parts: List[str] = []
-    parts.append("<!DOCTYPE html>")
-    parts.append("<html>")
-    parts.append("<head><meta charset='utf-8'><title>Context</title></head>")
-    parts.append("<body>")
-    parts.append("<h1>Organisation du projet</h1>")
+    if out is not None:
+        _render_html(out.write, snapshot)
+        return None
+    buf = io.StringIO()
+    _render_html(buf.write, snapshot)
+    return buf.getvalue()
 
-    for folder, content in snapshot.organisation.items():
-        parts.append(f"<h2>{folder}</h2>")
-        parts.append("<h3>Dossiers :</h3><ul>")
-        for d in content.get("dirs", []):
-            parts.append(f"<li>{d}</li>")
-        parts.append("</ul>")
-        parts.append("<h3>Fichiers :</h3><ul>")
-        for f in content.get("files", []):
-            parts.append(f"<li>{f}</li>")
-        parts.append("</ul><hr>")
-
-    parts.append("<h1>Contenu des fichiers</h1>")
-    for filepath, text in snapshot.files_content.items():
-        parts.append(f"<h2>{filepath}</h2>")
-        parts.append("<pre>")
-        parts.append(text)
-        parts.append("</pre>")
 
-    parts.append("</body></html>")
-    return "\n".join(parts)
+# Les exports sont écrits au fil de l'eau : le document complet n'existe jamais en mémoire
+_EXPORT_BUFFERING = 1 << 20
+
+
+def write_markdown(path: str, snapshot: ProjectSnapshot) -> None:
+    with open(path, "w", encoding="utf-8", buffering=_EXPORT_BUFFERING) as f:
+        generate_markdown(snapshot, f)
+
+
+def write_html(path: str, snapshot: ProjectSnapshot) -> None:
+    with open(path, "w", encoding="utf-8", buffering=_EXPORT_BUFFERING) as f:
+        generate_html(snapshot, f)
+
+
+_HTML_ESCAPE_TABLE = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;"})
 
 
 def escape_html(text: str) -> str:
     # Gardée pour compatibilité éventuelle, mais plus utilisée dans generate_html
-    return (
-        text.replace("&", "&amp;")
-        .replace("<", "&lt;")
-        .replace(">", "&gt;")
-    )
+    # Une seule passe C via str.translate au lieu de trois replace successifs
+    return text.translate(_HTML_ESCAPE_TABLE)
+
+
+_get_dirs_files = operator.itemgetter("dirs", "files")
 
 
 def filter_snapshot(snapshot: ProjectSnapshot, selected_files: List[str]) -> ProjectSnapshot:
     selected_set = set(selected_files)
-    filtered_files = {
-        path: content
-        for path, content in snapshot.files_content.items()
-        if path in selected_set
-    }
+    # On parcourt la sélection (souvent petite) plutôt que tout le snapshot ;
+    # les fichiers suivent l'ordre de selected_files.
+    fc = snapshot.files_content
+    filtered_files = {path: fc[path] for path in dict.fromkeys(selected_files) if path in fc}
+
+    # Regroupe la sélection par dossier : plus d'os.path.join dans la boucle
+    by_folder: Dict[str, Set[str]] = {}
+    for path in selected_set:
+        folder, _, base = path.rpartition(os.sep)
+        by_folder.setdefault(folder, set()).add(base)
 
+    # Les entrées d'organisation sont produites par scan_project : "dirs" et "files" toujours présents
     filtered_org: Dict[str, Dict[str, List[str]]] = {}
     for folder, content in snapshot.organisation.items():
-        files = [f for f in content.get("files", []) if os.path.join(folder, f) in selected_set]
+        local = by_folder.get(folder)
+        if not local:
+            continue
+        dirs, all_files = _get_dirs_files(content)
+        files = [f for f in all_files if f in local]
         if files:
             filtered_org[folder] = {
-                "dirs": content.get("dirs", []),
+                "dirs": dirs,
                 "files": files,
             }
 
@@ -1,4 +1,7 @@
-import os
+from collections import OrderedDict
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from tkinter import (
     Tk,
     Frame,
@@ -8,22 +11,25 @@ from tkinter import (
     SINGLE,
     MULTIPLE,
     END,
-    filedialog,
     messagebox,
     RIGHT,
     LEFT,
     Y,
     BOTH,
     Text,
+    Variable,
 )
 from tkinter import ttk
+from tkinter import font as tkfont
 
 from src.client_logic import ClientLogic
 
-from data.queries_manager import QueriesManager
-from src.queries_logic import QueriesLogic
-from interface.ui_queries import QueriesUI
+# Les modules du gestionnaire de requêtes et filedialog sont importés
+# à la demande, pour ne pas retarder l'affichage de la fenêtre.
 
+# Taille maximale (en caractères de contenu) des snapshots gardés en mémoire pour l'aperçu.
+# ServerLogic ne garde que le dernier snapshot chargé : un snapshot évincé ici est libéré.
+SNAPSHOT_CACHE_MAX_BYTES = 64 * 1024 * 1024
 
 """
 ApplicationUI is the main Tkinter-based user interface for the context management tool.
@@ -36,6 +42,13 @@ class ApplicationUI:
     Main application UI class for the context management tool.
     Handles all Tkinter widget layout, event binding, and delegates logic to ClientLogic and QueriesLogic.
     """
+    # Au-delà, l'aperçu est tronqué : Tk ne sait pas afficher vite de très gros textes
+    _PREVIEW_MAX_CHARS = 200_000
+    # Taille des tranches insérées dans l'aperçu entre deux passages de la boucle Tk
+    _PREVIEW_CHUNK = 16384
+    # Taille des tranches de remplissage de la liste des fichiers
+    _FILES_CHUNK = 2000
+
     def __init__(self, root: Tk):
         """
         Initialize the main application UI, set up the theme, logic, and layout.
@@ -48,22 +61,65 @@ class ApplicationUI:
         # --- Thème moderne ---
         style = ttk.Style()
         style.theme_use("clam")
+        # Police des titres, résolue une seule fois pour tous les labels
+        self._header_font = tkfont.Font(root=self.root, family="Segoe UI", size=11, weight="bold")
 
-        # Manager / logique pour les requêtes type
-        self._init_queries_module()
+        # Manager / logique pour les requêtes type : construits à la première ouverture
+        # de l'onglet Requêtes (lecture des JSON, thread d'écriture)
+        self.queries_manager = None
+        self.queries_logic = None
+        self.queries_ui = None
 
-        # ClientLogic peut maintenant recevoir queries_logic
-        self.client = ClientLogic(logic=self.queries_logic)
+        # ClientLogic reçoit queries_logic quand le module requêtes est initialisé
+        self.client = ClientLogic(logic=None)
 
 
         # Widgets principaux
         self.preview_text = None
         self.list_versions = None
         self.list_files = None
+        self.scroll_versions = None
+        self.scroll_files = None
+        # Copie Python de la liste des fichiers : index -> chemin sans aller-retour Tcl
+        self._files_list = []
+        self._files_fill_id = None
+        # Version dont les fichiers sont listés (None : liste vide ou en attente du chargement)
+        self._files_version = None
+        # Fichiers sélectionnés, recalculés une seule fois par événement de sélection
+        self._selected_files_cache = []
+        self._versions_list = []
+        self._version_index = {}
+        # Contenu de list_versions, lié par listvariable
+        self._versions_var = None
 
         self.memo_query = None
         self.memo_version = None
-        self.queries_logic.ui = self
+
+        # Snapshots des dernières versions consultées (LRU), pour ne pas relire le disque à chaque clic
+        self._snapshot_cache = OrderedDict()
+        self._snapshot_sizes = {}
+        self._cache_bytes = 0
+        # Chargements en cours, par (ServerLogic, version) : un chargement lancé pour
+        # l'ancien projet ne bloque pas la même version du nouveau
+        self._snapshot_loading = set()
+        # Aperçu différé : un défilement au clavier ne charge que le dernier fichier
+        self._preview_after_id = None
+        # (version, fichier) actuellement affiché dans l'aperçu
+        self._last_previewed = None
+        self._preview_stream_id = None
+
+        # Tâches longues (extraction, export, restauration) hors du thread Tk.
+        # Un seul worker : deux tâches sur le même projet ne doivent pas se chevaucher.
+        self._pool = ThreadPoolExecutor(max_workers=1)
+        self._pending = None
+        # Boutons désactivés pendant une tâche : actions longues, changement de projet, suppression
+        self._task_buttons = []
+
+        # Barre d'état en bas de fenêtre pour les messages d'information (non modaux).
+        # Packée avant le reste pour ne jamais être rognée.
+        self.status = Label(self.root, anchor="w")
+        self.status.pack(side="bottom", fill="x")
+        self._status_after = None
 
         self._build_layout()
 
@@ -75,30 +131,42 @@ class ApplicationUI:
     # -------------------------------------------------------------------------
     
     def _get_selected_files(self):
-        if hasattr(self, "list_files"):
-            return [self.list_files.get(i) for i in self.list_files.curselection()]
-        return []
+        return self.get_selected_files()
     
     def _init_queries_module(self):
-        self.queries_manager = QueriesManager()
+        """
+        Build the queries manager and logic, and hand the logic to ClientLogic.
+        Called the first time the Queries tab is opened.
+        """
+        from data.queries_manager import QueriesManager
+        from src.queries_logic import QueriesLogic
+
+        # Sauvegardes regroupées en arrière-plan pour ne pas bloquer Tk
+        self.queries_manager = QueriesManager(autosave_delay=0.25)
+
+        # Les callbacks ne retiennent pas l'interface : pas de cycle UI <-> QueriesLogic
+        root = self.root
 
         def copy_to_clipboard(text: str):
-            self.root.focus_force()
-            self.root.clipboard_clear()
-            self.root.clipboard_append(text)
-            self.root.update()
+            root.focus_force()
+            root.clipboard_clear()
+            root.clipboard_append(text)
+            root.update()
+
+        # IMPORTANT : ici on appelle la méthode de ApplicationUI (référence faible)
+        selected_files_method = weakref.WeakMethod(self._get_selected_files)
 
-        # IMPORTANT : ici on appelle la méthode de ApplicationUI
         def get_selected_files():
-            return self._get_selected_files()
+            method = selected_files_method()
+            return method() if method is not None else []
 
         self.queries_logic = QueriesLogic(
             manager=self.queries_manager,
             copy_to_clipboard=copy_to_clipboard,
             get_selected_files=get_selected_files,
+            base_path=self.client.project_root,
         )
-
-        self.queries_ui = None
+        self.client.logic = self.queries_logic
 
 
     # -------------------------------------------------------------------------
@@ -137,8 +205,8 @@ class ApplicationUI:
         # Construire le contenu de l’onglet Projet
         self._build_project_tab(self.tab_project)
 
-        # Construire le contenu de l’onglet Requêtes type
-        self._build_queries_tab(self.tab_queries)
+        # L’onglet Requêtes type est construit à sa première ouverture
+        self.notebook.bind("<<NotebookTabChanged>>", self._on_tab_changed)
 
         # ---------------------------------------------------------------------
         # COLONNE DROITE : Fichiers + Prévisualisation + Actions
@@ -154,39 +222,52 @@ class ApplicationUI:
         Args:
             parent: The parent frame for the project tab.
         """
-        Label(parent, text="Projet", font=("Segoe UI", 11, "bold")).pack(pady=5)
-        ttk.Button(parent, text="Sélectionner un dossier", command=self.on_select_project).pack(pady=5)
+        Label(parent, text="Projet", font=self._header_font).pack(pady=5)
+        self._task_button(parent, "Sélectionner un dossier", self.on_select_project)
         ttk.Button(parent, text="Ouvrir le dossier sélectionné", command=self.on_open_folder).pack(pady=5)
 
-        Label(parent, text="Extraction complète", font=("Segoe UI", 11, "bold")).pack(pady=5)
-        ttk.Button(parent, text="Extraire l'ensemble du projet", command=self.on_extract_full).pack(pady=5)
+        Label(parent, text="Extraction complète", font=self._header_font).pack(pady=5)
+        self._task_button(parent, "Extraire l'ensemble du projet", self.on_extract_full)
 
-        Label(parent, text="Versions disponibles", font=("Segoe UI", 11, "bold")).pack(pady=5)
+        Label(parent, text="Versions disponibles", font=self._header_font).pack(pady=5)
 
         frame_versions = Frame(parent)
         frame_versions.pack(fill="both", expand=True)
 
-        self.list_versions = Listbox(frame_versions, selectmode=SINGLE, height=10)
+        self._versions_var = Variable(self.root, value=())
+        self.list_versions = Listbox(frame_versions, selectmode=SINGLE, height=10, listvariable=self._versions_var)
         self.list_versions.pack(side=LEFT, fill=BOTH, expand=True)
 
-        scroll_versions = Scrollbar(frame_versions, orient="vertical", command=self.list_versions.yview)
-        scroll_versions.pack(side=RIGHT, fill=Y)
+        self.scroll_versions = Scrollbar(frame_versions, orient="vertical", command=self.list_versions.yview)
+        self.scroll_versions.pack(side=RIGHT, fill=Y)
 
-        self.list_versions.config(yscrollcommand=scroll_versions.set)
+        self.list_versions.config(yscrollcommand=self.scroll_versions.set)
         self.list_versions.bind("<<ListboxSelect>>", self.on_select_version)
 
-        ttk.Button(parent, text="Restaurer la version sélectionnée", command=self.on_restore_full).pack(pady=5)
-        ttk.Button(parent, text="Supprimer la version sélectionnée", command=self.on_delete_version).pack(pady=5)
+        self._task_button(parent, "Restaurer la version sélectionnée", self.on_restore_full)
+        self._task_button(parent, "Supprimer la version sélectionnée", self.on_delete_version)
 
     # -------------------------------------------------------------------------
     #  ONGLET REQUÊTES TYPE
     # -------------------------------------------------------------------------
+    def _on_tab_changed(self, event=None):
+        """
+        Build the Queries tab the first time it is selected.
+        """
+        if self.queries_ui is None and self.notebook.select() == str(self.tab_queries):
+            self._build_queries_tab(self.tab_queries)
+
     def _build_queries_tab(self, parent: Frame):
         """
         Build the widgets for the Queries tab (prompt templates management).
         Args:
             parent: The parent frame for the queries tab.
         """
+        from interface.ui_queries import QueriesUI
+
+        if self.queries_logic is None:
+            self._init_queries_module()
+
         # On insère directement QueriesUI dans cet onglet
         self.queries_ui = QueriesUI(
             parent,
@@ -206,7 +287,7 @@ class ApplicationUI:
         Args:
             parent: The parent frame for the right column.
         """
-        Label(parent, text="Fichiers de la version sélectionnée", font=("Segoe UI", 11, "bold")).pack(pady=5)
+        Label(parent, text="Fichiers de la version sélectionnée", font=self._header_font).pack(pady=5)
 
         frame_files = Frame(parent)
         frame_files.pack(fill="both", expand=False, padx=10, pady=5)
@@ -214,13 +295,13 @@ class ApplicationUI:
         self.list_files = Listbox(frame_files, selectmode=MULTIPLE, height=12)
         self.list_files.pack(side=LEFT, fill=BOTH, expand=True)
 
-        scroll_files = Scrollbar(frame_files, orient="vertical", command=self.list_files.yview)
-        scroll_files.pack(side=RIGHT, fill=Y)
+        self.scroll_files = Scrollbar(frame_files, orient="vertical", command=self.list_files.yview)
+        self.scroll_files.pack(side=RIGHT, fill=Y)
 
-        self.list_files.config(yscrollcommand=scroll_files.set)
+        self.list_files.config(yscrollcommand=self.scroll_files.set)
         self.list_files.bind("<<ListboxSelect>>", self.on_file_selected)
 
-        Label(parent, text="Prévisualisation du fichier", font=("Segoe UI", 11, "bold")).pack(pady=5)
+        Label(parent, text="Prévisualisation du fichier", font=self._header_font).pack(pady=5)
 
         frame_preview = Frame(parent)
         frame_preview.pack(fill="both", expand=True, padx=10, pady=5)
@@ -233,8 +314,8 @@ class ApplicationUI:
 
         self.preview_text.config(yscrollcommand=scroll_preview.set)
 
-        ttk.Button(parent, text="Créer selected_context.md & .html", command=self.on_export_selected).pack(pady=5)
-        ttk.Button(parent, text="Restaurer les fichiers sélectionnés", command=self.on_restore_selected).pack(pady=5)
+        self._task_button(parent, "Créer selected_context.md & .html", self.on_export_selected)
+        self._task_button(parent, "Restaurer les fichiers sélectionnés", self.on_restore_selected)
 
 
     # -------------------------------------------------------------------------
@@ -244,11 +325,17 @@ class ApplicationUI:
         """
         Handler for selecting a new project folder. Updates project state and version list.
         """
+        from tkinter import filedialog
+
+        # La tâche en cours travaille sur le projet actuel : pas de changement avant sa fin
+        if self._pending is not None:
+            return
         folder = filedialog.askdirectory()
         if not folder:
             return
         self.client.select_project(folder)
-        messagebox.showinfo("Projet sélectionné", f"Dossier : {folder}")
+        self._clear_snapshots()
+        self._flash(f"Projet sélectionné : {folder}")
         self.refresh_versions()
 
     def on_open_folder(self):
@@ -263,12 +350,25 @@ class ApplicationUI:
     def on_extract_full(self):
         """
         Handler to extract (snapshot) the full project and update the version list.
+        The extraction runs in the background worker.
         """
         if not self.client.has_project():
             messagebox.showerror("Erreur", "Aucun projet sélectionné.")
             return
-        version = self.client.extract_full_project()
-        messagebox.showinfo("Extraction terminée", f"Version créée : {version}")
+        # Projet capturé au clic : la tâche ne relit pas l'état de ClientLogic
+        self._run_in_background(
+            partial(self.client.extract_full_project, self.client.server),
+            self._on_extract_done,
+        )
+
+    def _on_extract_done(self, version: str):
+        """
+        Completion of on_extract_full, back on the Tk thread.
+        Args:
+            version: The version identifier created by the extraction.
+        """
+        self._drop_snapshot(version)
+        self._flash(f"Extraction terminée : version {version} créée.")
         self.refresh_versions()
         self.select_version_in_list(version)
 
@@ -278,10 +378,15 @@ class ApplicationUI:
         """
         if self.list_versions is None:
             return
-        self.list_versions.delete(0, END)
         versions = self.client.get_available_versions()
-        for v in versions:
-            self.list_versions.insert(END, v)
+        # Copie Python du contenu de la liste, pour les recherches sans aller-retour Tcl
+        self._versions_list = versions
+        self._version_index = {v: i for i, v in enumerate(versions)}
+        # Scrollbar détachée pendant le remplissage : un seul recalcul à la fin
+        self.list_versions.config(yscrollcommand="")
+        # Une seule écriture de la listvariable remplace vidage et insertion
+        self._versions_var.set(tuple(versions))
+        self._reattach_scrollbar(self.list_versions, self.scroll_versions)
 
     def on_select_version(self, event=None):
         """
@@ -290,8 +395,7 @@ class ApplicationUI:
         selection = self.list_versions.curselection()
         if not selection:
             return
-        index = selection[0]
-        version = self.list_versions.get(index)
+        version = self._versions_list[selection[0]]
         self.client.select_version(version)
         self.refresh_files()
 
@@ -299,22 +403,36 @@ class ApplicationUI:
         """
         Handler to restore all files from the selected version.
         """
-        try:
-            self.client.restore_full_version()
-            messagebox.showinfo("Restauration", "Restauration complète effectuée.")
-        except Exception as e:
-            messagebox.showerror("Erreur", str(e))
+        self._run_in_background(
+            partial(self.client.restore_full_version, self.client.server, self.client.selected_version),
+            lambda _: self._flash("Restauration complète effectuée."),
+        )
 
     def on_delete_version(self):
         """
         Handler to delete the selected version and clear file/preview lists.
         """
+        if self._pending is not None:
+            return
+        version = self.client.selected_version
+        self._drop_snapshot(version)
         self.client.delete_selected_version()
-        self.refresh_versions()
+        index = self._version_index.get(version)
+        if index is None or self.list_versions is None:
+            self.refresh_versions()
+        else:
+            # Suppression de la seule ligne concernée plutôt qu'un rechargement complet
+            self.list_versions.delete(index)
+            del self._versions_list[index]
+            self._version_index = {v: i for i, v in enumerate(self._versions_list)}
         if self.list_files is not None:
+            self._cancel_files_fill()
             self.list_files.delete(0, END)
-        if self.preview_text is not None:
-            self.preview_text.delete(1.0, END)
+            self._files_list = []
+            self._files_version = None
+            self._selected_files_cache = []
+        self._last_previewed = None
+        self._clear_preview()
 
     # -------------------------------------------------------------------------
     #  ACTIONS COLONNE DROITE
@@ -322,53 +440,178 @@ class ApplicationUI:
     def refresh_files(self):
         """
         Refresh the file list for the selected version and clear the preview.
+        If the snapshot is not in memory yet, it is loaded in the background worker
+        and the list is filled once it arrives (see _on_snapshot_loaded).
         """
         if self.list_files is None:
             return
+        self._cancel_files_fill()
+        self._files_list = []
+        self._files_version = None
+        self._selected_files_cache = []
+        self._last_previewed = None
         self.list_files.delete(0, END)
-        files = self.client.get_files_from_selected_version()
-        for f in files:
-            self.list_files.insert(END, f)
-        if self.preview_text is not None:
-            self.preview_text.delete(1.0, END)
+        self._clear_preview()
+        version = self.client.selected_version
+        if not self.client.has_project() or not version:
+            return
+        snapshot = self._get_snapshot(version)
+        if snapshot is None:
+            self._load_snapshot_async(version)
+            return
+        self._populate_files(snapshot)
+
+    def _populate_files(self, snapshot):
+        """
+        Fill the file list with the files of a loaded snapshot.
+        Args:
+            snapshot: The snapshot of the selected version.
+        """
+        self._files_version = snapshot.version
+        self._files_list = sorted(snapshot.files_content)
+        # Scrollbar détachée pendant la première tranche
+        self.list_files.config(yscrollcommand="")
+        self._fill_files(0)
+        self._reattach_scrollbar(self.list_files, self.scroll_files)
+
+    def _fill_files(self, start: int):
+        """
+        Insert the next chunk of files into the list, then yield to the event loop.
+        The first chunk fills the visible area at once; for very large projects
+        the rest is appended in the background so the window stays responsive.
+        Args:
+            start: Index in self._files_list of the first file to insert.
+        """
+        end = start + self._FILES_CHUNK
+        chunk = self._files_list[start:end]
+        if chunk:
+            self.list_files.insert(END, *chunk)
+        if end < len(self._files_list):
+            self._files_fill_id = self.root.after(1, self._fill_files, end)
+        else:
+            self._files_fill_id = None
+
+    @staticmethod
+    def _reattach_scrollbar(listbox: Listbox, scrollbar: Scrollbar):
+        """
+        Reconnect a scrollbar detached during a bulk update and sync it with the list view.
+        Args:
+            listbox: The listbox that was refilled.
+            scrollbar: Its vertical scrollbar.
+        """
+        listbox.config(yscrollcommand=scrollbar.set)
+        scrollbar.set(*listbox.yview())
+
+    def _cancel_files_fill(self):
+        """
+        Stop filling the file list from a previous refresh.
+        """
+        if self._files_fill_id is not None:
+            self.root.after_cancel(self._files_fill_id)
+            self._files_fill_id = None
 
     def on_file_selected(self, event=None):
         """
-        Handler for selecting a file in the list. Shows the file content in the preview.
+        Handler for selecting a file in the list. Updates the selected files cache
+        and schedules the preview update so that rapid selection changes only
+        render the last selected file.
         """
-        selection = self.list_files.curselection()
-        if not selection:
-            self.preview_text.delete(1.0, END)
+        files_list = self._files_list
+        self._selected_files_cache = [files_list[i] for i in self.list_files.curselection()]
+        if self._preview_after_id is not None:
+            self.root.after_cancel(self._preview_after_id)
+        self._preview_after_id = self.root.after(50, self._do_preview)
+
+    def _do_preview(self):
+        """
+        Show the content of the currently selected file in the preview.
+        """
+        self._preview_after_id = None
+        if not self._selected_files_cache:
+            self._last_previewed = None
+            self._clear_preview()
             return
 
-        index = selection[0]
-        filename = self.list_files.get(index)
+        version = self.client.selected_version
+        # Même fichier qu'à l'affichage précédent (re-clic, Ctrl-clic sur un autre) : rien à refaire
+        if (version, self._selected_files_cache[0]) == self._last_previewed:
+            return
+        snapshot = self._get_snapshot(version)
+        if snapshot is None:
+            self._load_snapshot_async(version)
+            return
+        self._show_preview(snapshot)
 
-        snapshot = self.client.server.load_snapshot(self.client.selected_version)
+    def _show_preview(self, snapshot):
+        """
+        Render the first selected file of the given snapshot in the preview.
+        Args:
+            snapshot: The loaded snapshot of the selected version.
+        """
+        if not self._selected_files_cache:
+            return
+        filename = self._selected_files_cache[0]
+        self._last_previewed = (snapshot.version, filename)
         content = snapshot.files_content.get(filename, "")
+        if len(content) > self._PREVIEW_MAX_CHARS:
+            content = content[:self._PREVIEW_MAX_CHARS] + "\n\n… (aperçu tronqué)"
+
+        self._clear_preview()
+        # Sans retour à la ligne pendant l'insertion, le calcul du wrap n'est fait qu'une fois
+        self.preview_text.configure(wrap="none")
+        self._stream_preview(content, 0)
+
+    def _stream_preview(self, content: str, start: int):
+        """
+        Insert the next chunk of content into the preview, then yield to the event loop
+        so that large files appear progressively without freezing the window.
+        Args:
+            content: The full text being displayed.
+            start: Offset of the first character to insert.
+        """
+        end = start + self._PREVIEW_CHUNK
+        self.preview_text.insert(END, content[start:end])
+        if end < len(content):
+            self._preview_stream_id = self.root.after(1, self._stream_preview, content, end)
+        else:
+            self._preview_stream_id = None
+            self.preview_text.configure(wrap="word")
 
+    def _clear_preview(self):
+        """
+        Stop any preview being streamed and empty the preview widget.
+        """
+        if self.preview_text is None:
+            return
+        if self._preview_stream_id is not None:
+            self.root.after_cancel(self._preview_stream_id)
+            self._preview_stream_id = None
+            self.preview_text.configure(wrap="word")
         self.preview_text.delete(1.0, END)
-        self.preview_text.insert(END, content)
 
     def on_export_selected(self):
         """
         Handler to export selected files as markdown and HTML context files.
         """
-        selected_indices = self.list_files.curselection()
-        files = [self.list_files.get(i) for i in selected_indices]
+        files = self.get_selected_files()
         self.client.set_selected_files(files)
-        self.client.export_selected_markdown_and_html()
-        messagebox.showinfo("Export", "selected_context.md et selected_context.html générés.")
+        self._run_in_background(
+            partial(self.client.export_selected_markdown_and_html,
+                    self.client.server, self.client.selected_version, files),
+            lambda _: self._flash("selected_context.md et selected_context.html générés."),
+        )
 
     def on_restore_selected(self):
         """
         Handler to restore only the selected files from the current version.
         """
-        selected_indices = self.list_files.curselection()
-        files = [self.list_files.get(i) for i in selected_indices]
+        files = self.get_selected_files()
         self.client.set_selected_files(files)
-        self.client.restore_selected_files()
-        messagebox.showinfo("Restauration", "Fichiers sélectionnés restaurés.")
+        self._run_in_background(
+            partial(self.client.restore_selected_files,
+                    self.client.server, self.client.selected_version, files),
+            lambda _: self._flash("Fichiers sélectionnés restaurés."),
+        )
 
     # -------------------------------------------------------------------------
     #  HELPERS
@@ -377,10 +620,184 @@ class ApplicationUI:
         """
         Return the list of files selected in the right column (used by QueriesLogic for prompt context).
         """
-        if self.list_files is None:
-            return []
-        selected_indices = self.list_files.curselection()
-        return [self.list_files.get(i) for i in selected_indices]
+        return list(self._selected_files_cache)
+
+    def _flash(self, message: str, duration_ms: int = 3000):
+        """
+        Show an information message in the status bar, cleared after duration_ms.
+        Errors keep using modal message boxes.
+        Args:
+            message: Text to display.
+            duration_ms: Display duration in milliseconds.
+        """
+        self._set_status(message)
+        self._status_after = self.root.after(duration_ms, self._clear_status)
+
+    def _set_status(self, message: str = ""):
+        """
+        Show a message in the status bar until it is replaced (an empty message clears it).
+        Args:
+            message: Text to display.
+        """
+        if self._status_after is not None:
+            self.root.after_cancel(self._status_after)
+            self._status_after = None
+        self.status.configure(text=message)
+
+    def _clear_status(self):
+        """
+        Clear the status bar.
+        """
+        self._status_after = None
+        self.status.configure(text="")
+
+    def _run_in_background(self, func, on_done):
+        """
+        Run func in the background worker and call on_done(result) on the Tk thread once it finishes.
+        Errors are reported in a message box. Only one task may be pending at a time.
+        Args:
+            func: Callable to run off the Tk thread (must not touch widgets). It should
+                carry the state it needs (project, version, files) captured on the Tk thread.
+            on_done: Callable receiving func's result, run on the Tk thread.
+        """
+        if self._pending is not None:
+            self._flash("Une opération est déjà en cours.")
+            return
+        self._pending = self._pool.submit(func)
+        self._set_task_buttons("disabled")
+        self.root.config(cursor="watch")
+        self._set_status("Calcul en cours…")
+        self._poll_future(self._pending, lambda future: self._finish_background(future, on_done))
+
+    def _task_button(self, parent: Frame, text: str, command):
+        """
+        Create and pack a button that is disabled while a background task runs.
+        Args:
+            parent: The parent frame.
+            text: Button label.
+            command: Click handler.
+        """
+        button = ttk.Button(parent, text=text, command=command)
+        button.pack(pady=5)
+        self._task_buttons.append(button)
+
+    def _set_task_buttons(self, state: str):
+        """
+        Apply a ttk state ("disabled" / "!disabled") to the buttons registered by _task_button.
+        """
+        for button in self._task_buttons:
+            button.state([state])
+
+    def _poll_future(self, future, callback):
+        """
+        Poll a worker future from the Tk event loop and call callback(future) once it is done
+        (Tk is not thread-safe, so the worker never calls back into widgets itself).
+        Args:
+            future: The concurrent.futures.Future to wait for.
+            callback: Callable receiving the finished future, run on the Tk thread.
+        """
+        if not future.done():
+            self.root.after(50, self._poll_future, future, callback)
+            return
+        callback(future)
+
+    def _finish_background(self, future, on_done):
+        """
+        Completion of _run_in_background, back on the Tk thread.
+        """
+        self._pending = None
+        self._set_task_buttons("!disabled")
+        self.root.config(cursor="")
+        self._set_status()
+        try:
+            result = future.result()
+        except Exception as e:
+            messagebox.showerror("Erreur", str(e))
+            return
+        on_done(result)
+
+    def _get_snapshot(self, version: str):
+        """
+        Return the cached snapshot for the given version, or None if it is not loaded yet.
+        The cache is bounded by SNAPSHOT_CACHE_MAX_BYTES, least recently used first out.
+        Args:
+            version: The version identifier to look up.
+        """
+        snapshot = self._snapshot_cache.get(version)
+        if snapshot is not None:
+            self._snapshot_cache.move_to_end(version)
+        return snapshot
+
+    def _load_snapshot_async(self, version: str):
+        """
+        Load a snapshot in the background worker, then cache it and refresh the preview.
+        Args:
+            version: The version identifier to load.
+        """
+        server = self.client.server
+        key = (server, version)
+        if key in self._snapshot_loading:
+            return
+        self._snapshot_loading.add(key)
+        if self._pending is None:
+            self._set_status("Chargement de la version…")
+        future = self._pool.submit(server.load_snapshot, version)
+        self._poll_future(future, lambda f: self._on_snapshot_loaded(server, version, f))
+
+    def _on_snapshot_loaded(self, server, version: str, future):
+        """
+        Completion of _load_snapshot_async, back on the Tk thread.
+        The result is dropped if another project was selected in the meantime.
+        """
+        self._snapshot_loading.discard((server, version))
+        if self._pending is None:
+            self._set_status()
+        try:
+            snapshot = future.result()
+        except Exception as e:
+            messagebox.showerror("Erreur", str(e))
+            return
+        if server is not self.client.server:
+            return
+        self._cache_snapshot(version, snapshot)
+        if version != self.client.selected_version:
+            return
+        if self._files_version != version:
+            self._populate_files(snapshot)
+        else:
+            self._show_preview(snapshot)
+
+    def _cache_snapshot(self, version: str, snapshot):
+        """
+        Add a snapshot to the cache, evicting the least recently used ones beyond
+        SNAPSHOT_CACHE_MAX_BYTES (the newest snapshot is always kept).
+        Args:
+            version: The version identifier.
+            snapshot: The loaded snapshot.
+        """
+        self._drop_snapshot(version)
+        size = sum(map(len, snapshot.files_content.values()))
+        self._snapshot_cache[version] = snapshot
+        self._snapshot_sizes[version] = size
+        self._cache_bytes += size
+        while self._cache_bytes > SNAPSHOT_CACHE_MAX_BYTES and len(self._snapshot_cache) > 1:
+            oldest, _ = self._snapshot_cache.popitem(last=False)
+            self._cache_bytes -= self._snapshot_sizes.pop(oldest)
+
+    def _drop_snapshot(self, version: str):
+        """
+        Remove a version from the snapshot cache, if present.
+        """
+        if self._snapshot_cache.pop(version, None) is not None:
+            self._cache_bytes -= self._snapshot_sizes.pop(version)
+
+    def _clear_snapshots(self):
+        """
+        Empty the snapshot cache (e.g. when another project is selected).
+        """
+        self._snapshot_cache.clear()
+        self._snapshot_sizes.clear()
+        self._cache_bytes = 0
 
     def select_version_in_list(self, version: str):
         """
@@ -390,10 +807,11 @@ class ApplicationUI:
         """
         if self.list_versions is None:
             return
-        for i in range(self.list_versions.size()):
-            if self.list_versions.get(i) == version:
-                self.list_versions.selection_clear(0, END)
-                self.list_versions.selection_set(i)
-                self.list_versions.activate(i)
-                self.on_select_version()
-                break
+        i = self._version_index.get(version)
+        if i is None:
+            return
+        self.list_versions.selection_clear(0, END)
+        self.list_versions.selection_set(i)
+        self.list_versions.activate(i)
+        self.list_versions.see(i)
+        self.on_select_version()
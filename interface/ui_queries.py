@@ -1,8 +1,13 @@
+import queue
+import threading
+from typing import Dict, List, Optional
 from tkinter import (
     Frame, Label, Listbox, Scrollbar, SINGLE, END, BOTH, LEFT, RIGHT, Y,
     Text, StringVar
 )
 from tkinter import ttk, filedialog, messagebox
+from tkinter import font as tkfont
+from tkinter.simpledialog import askstring
 
 from data.queries_manager import QueriesManager
 
@@ -13,6 +18,49 @@ Handles all widget layout, user input, and delegates logic to QueriesManager/Que
 No business logic is implemented here; all actions are delegated to the appropriate logic classes.
 """
 
+class _ListModel:
+    """
+    Python-side mirror of a Listbox: its rows and a row value -> index lookup,
+    so that filling and selecting never have to read items back from Tk.
+    """
+    def __init__(self, listbox: Listbox):
+        self.listbox = listbox
+        self.names: List[str] = []
+        self.index: Dict[str, int] = {}
+
+    def reset(self, names: List[str]) -> bool:
+        """
+        Replace the rows of the listbox with names, unless it already shows exactly these rows.
+        Args:
+            names: The rows to display.
+        Returns:
+            True if the listbox was repopulated, False if it was already up to date.
+        """
+        if names == self.names:
+            return False
+        self.listbox.delete(0, END)
+        # Un seul appel Tcl pour toutes les lignes
+        if names:
+            self.listbox.insert(END, *names)
+        self.names = names
+        self.index = {name: i for i, name in enumerate(names)}
+        return True
+
+    def select(self, value: Optional[str]) -> None:
+        """
+        Select the given value in the listbox, if present (clears the selection otherwise).
+        Args:
+            value: The row to select.
+        """
+        self.listbox.selection_clear(0, END)
+        if not value:
+            return
+        i = self.index.get(value)
+        if i is not None:
+            self.listbox.selection_set(i)
+            self.listbox.activate(i)
+
+
 class QueriesUI(Frame):
     """
     UI component for managing prompt queries and their versions.
@@ -38,6 +86,31 @@ class QueriesUI(Frame):
         # Flag pour éviter les callbacks parasites sur les versions
         self._lock_versions = False
 
+        # Plus grand numéro de version (entier) connu par requête, None si aucun
+        self._max_version_per_query = {}
+
+        # Dernier contenu chargé dans chaque zone de texte, pour ne pas la réécrire à l'identique
+        self._text_shown = {}
+
+        # Import / export en cours dans un thread
+        self._io_thread = None
+
+        # Flag pour ignorer les sélections pendant le remplissage des listes
+        self._suspend_select = False
+
+        # Sélections en attente (navigation rapide au clavier), par liste
+        self._selection_after = {}
+
+        # Rafraîchissements en attente, exécutés une seule fois quand Tk est inactif
+        self._dirty_categories = False
+        self._dirty_queries = False
+        self._dirty_versions = False
+        self._dirty_editor = False
+        self._refresh_id = None
+
+        # Police des libellés, résolue une seule fois pour tous les labels
+        self._label_font = tkfont.Font(root=self, family="Segoe UI", size=10, weight="bold")
+
         # Variables UI
         self.var_query_name = StringVar()
         self.var_category = StringVar()
@@ -62,6 +135,10 @@ class QueriesUI(Frame):
         """
         main = ttk.PanedWindow(self, orient="horizontal")
         main.pack(fill=BOTH, expand=True)
+        self._paned = main
+
+        # Barre de progression affichée pendant les imports / exports
+        self.progress = ttk.Progressbar(self, mode="indeterminate")
 
         left = Frame(main)
         right = Frame(main)
@@ -71,15 +148,15 @@ class QueriesUI(Frame):
         # ============================
         #  FORMULAIRE COMPLET À DROITE
         # ============================
-        Label(right, text="Nom de la requête", font=("Segoe UI", 10, "bold")).pack(anchor="w", pady=2)
+        Label(right, text="Nom de la requête", font=self._label_font).pack(anchor="w", pady=2)
         self.entry_query_name = ttk.Entry(right, textvariable=self.var_query_name)
         self.entry_query_name.pack(fill="x", padx=5, pady=2)
 
-        Label(right, text="Catégorie", font=("Segoe UI", 10, "bold")).pack(anchor="w", pady=2)
+        Label(right, text="Catégorie", font=self._label_font).pack(anchor="w", pady=2)
         self.combo_category = ttk.Combobox(right, textvariable=self.var_category, state="normal")
         self.combo_category.pack(fill="x", padx=5, pady=2)
 
-        Label(right, text="Description", font=("Segoe UI", 10, "bold")).pack(anchor="w", pady=2)
+        Label(right, text="Description", font=self._label_font).pack(anchor="w", pady=2)
         frame_desc = Frame(right)
         frame_desc.pack(fill=BOTH, expand=False, padx=5, pady=2)
         self.text_description = Text(frame_desc, height=4, wrap="word")
@@ -88,15 +165,15 @@ class QueriesUI(Frame):
         scroll_desc.pack(side=RIGHT, fill=Y)
         self.text_description.config(yscrollcommand=scroll_desc.set)
 
-        Label(right, text="Context files (@file1 @file2 ...)", font=("Segoe UI", 10, "bold")).pack(anchor="w", pady=2)
+        Label(right, text="Context files (@file1 @file2 ...)", font=self._label_font).pack(anchor="w", pady=2)
         self.entry_context_files = ttk.Entry(right, textvariable=self.var_context_files)
         self.entry_context_files.pack(fill="x", padx=5, pady=2)
 
-        Label(right, text="Numéro de version", font=("Segoe UI", 10, "bold")).pack(anchor="w", pady=2)
+        Label(right, text="Numéro de version", font=self._label_font).pack(anchor="w", pady=2)
         self.entry_version = ttk.Entry(right, textvariable=self.var_version)
         self.entry_version.pack(fill="x", padx=5, pady=2)
 
-        Label(right, text="Before", font=("Segoe UI", 10, "bold")).pack(anchor="w", pady=2)
+        Label(right, text="Before", font=self._label_font).pack(anchor="w", pady=2)
         frame_before = Frame(right)
         frame_before.pack(fill=BOTH, expand=True, padx=5, pady=2)
         self.text_before = Text(frame_before, height=8, wrap="word")
@@ -105,7 +182,7 @@ class QueriesUI(Frame):
         scroll_before.pack(side=RIGHT, fill=Y)
         self.text_before.config(yscrollcommand=scroll_before.set)
 
-        Label(right, text="After", font=("Segoe UI", 10, "bold")).pack(anchor="w", pady=2)
+        Label(right, text="After", font=self._label_font).pack(anchor="w", pady=2)
         frame_after = Frame(right)
         frame_after.pack(fill=BOTH, expand=True, padx=5, pady=2)
         self.text_after = Text(frame_after, height=8, wrap="word")
@@ -130,7 +207,7 @@ class QueriesUI(Frame):
         frame_cat = Frame(left)
         frame_cat.pack(fill=BOTH, expand=False, padx=5, pady=5)
 
-        Label(frame_cat, text="Catégories", font=("Segoe UI", 10, "bold")).pack()
+        Label(frame_cat, text="Catégories", font=self._label_font).pack()
 
         self.list_categories = Listbox(frame_cat, selectmode=SINGLE, height=5)
         self.list_categories.pack(side=LEFT, fill=BOTH, expand=True)
@@ -138,6 +215,7 @@ class QueriesUI(Frame):
         scroll_cat.pack(side=RIGHT, fill=Y)
         self.list_categories.config(yscrollcommand=scroll_cat.set)
         self.list_categories.bind("<<ListboxSelect>>", self._on_category_selected)
+        self._categories_model = _ListModel(self.list_categories)
 
         btn_cat = Frame(left)
         btn_cat.pack(fill="x", padx=5)
@@ -150,7 +228,7 @@ class QueriesUI(Frame):
         # ============================
         #  SECTION REQUÊTES
         # ============================
-        Label(left, text="Requêtes", font=("Segoe UI", 10, "bold")).pack(pady=4)
+        Label(left, text="Requêtes", font=self._label_font).pack(pady=4)
 
         frame_req = Frame(left)
         frame_req.pack(fill=BOTH, expand=True, padx=5)
@@ -161,6 +239,7 @@ class QueriesUI(Frame):
         scroll_req.pack(side=RIGHT, fill=Y)
         self.list_queries.config(yscrollcommand=scroll_req.set)
         self.list_queries.bind("<<ListboxSelect>>", self._on_query_selected)
+        self._queries_model = _ListModel(self.list_queries)
 
         btn_req = Frame(left)
         btn_req.pack(fill="x", padx=5, pady=2)
@@ -173,7 +252,7 @@ class QueriesUI(Frame):
         # ============================
         #  SECTION VERSIONS
         # ============================
-        Label(left, text="Versions", font=("Segoe UI", 10, "bold")).pack(pady=4)
+        Label(left, text="Versions", font=self._label_font).pack(pady=4)
 
         frame_ver = Frame(left)
         frame_ver.pack(fill=BOTH, expand=True, padx=5)
@@ -184,6 +263,7 @@ class QueriesUI(Frame):
         scroll_ver.pack(side=RIGHT, fill=Y)
         self.list_versions.config(yscrollcommand=scroll_ver.set)
         self.list_versions.bind("<<ListboxSelect>>", self._on_version_selected)
+        self._versions_model = _ListModel(self.list_versions)
 
         btn_ver = Frame(left)
         btn_ver.pack(fill="x", padx=5, pady=2)
@@ -199,25 +279,23 @@ class QueriesUI(Frame):
         """
         Refresh the categories list and combobox from the manager.
         """
-        self.list_categories.unbind("<<ListboxSelect>>")
+        self._suspend_select = True
+        try:
+            cats = self.manager.get_categories()
+            selected = self.list_categories.curselection()
 
-        cats = self.manager.get_categories()
-        selected = self.list_categories.curselection()
+            if not self._categories_model.reset(cats):
+                return
 
-        self.list_categories.delete(0, END)
-        for c in cats:
-            self.list_categories.insert(END, c)
+            self.combo_category["values"] = tuple(cats)
 
-        self.combo_category["values"] = cats
-
-        if selected:
-            try:
-                self.list_categories.selection_set(selected[0])
-            except Exception:
-                pass
-
-        self.list_categories.bind("<<ListboxSelect>>", self._on_category_selected)
-        self.list_queries.bind("<<ListboxSelect>>", self._on_query_selected)
+            if selected:
+                try:
+                    self.list_categories.selection_set(selected[0])
+                except Exception:
+                    pass
+        finally:
+            self._suspend_select = False
 
     def _refresh_queries(self):
         """
@@ -225,26 +303,23 @@ class QueriesUI(Frame):
         """
         selected = self.current_query
 
-        self.list_queries.delete(0, END)
-        for name in self.manager.get_all_query_names():
-            self.list_queries.insert(END, name)
+        self._queries_model.reset(self.manager.get_all_query_names())
+        self._queries_model.select(selected)
 
-        self._select_in_list(self.list_queries, selected)
-
-    def _refresh_versions(self):
+    def _refresh_versions(self, versions=None):
         """
         Refresh the versions list for the current query.
+        Args:
+            versions: Version numbers of the current query, if the caller already fetched them.
         """
         self._lock_versions = True
 
         selected = self.current_version
 
-        self.list_versions.delete(0, END)
-        if self.current_query:
-            for v in self.manager.get_versions_for_query(self.current_query):
-                self.list_versions.insert(END, v)
-
-        self._select_in_list(self.list_versions, selected)
+        if versions is None:
+            versions = self.manager.get_versions_for_query(self.current_query) if self.current_query else []
+        self._versions_model.reset(versions)
+        self._versions_model.select(selected)
 
         self._lock_versions = False
 
@@ -265,13 +340,12 @@ class QueriesUI(Frame):
             self.var_category.set(q.get("category", ""))
             self.var_context_files.set(q.get("context_files", ""))
 
-            self.text_description.delete("1.0", END)
-            self.text_description.insert("1.0", q.get("description", ""))
+            self._set_text(self.text_description, q.get("description", ""))
         else:
             self.var_query_name.set("")
             self.var_category.set("")
             self.var_context_files.set("")
-            self.text_description.delete("1.0", END)
+            self._set_text(self.text_description, "")
 
         # --- Version sélectionnée ---
         if q and self.current_version:
@@ -279,36 +353,86 @@ class QueriesUI(Frame):
         else:
             v = None
 
-        if v:
-            self.var_version.set(v.get("version", ""))
-            self.text_before.delete("1.0", END)
-            self.text_before.insert("1.0", v.get("before", ""))
-
-            self.text_after.delete("1.0", END)
-            self.text_after.insert("1.0", v.get("after", ""))
-        else:
-            self.var_version.set("")
-            self.text_before.delete("1.0", END)
-            self.text_after.delete("1.0", END)
+        self._load_version_fields(v)
 
         # Sélection visuelle
-        self._select_in_list(self.list_queries, self.current_query)
-        self._select_in_list(self.list_versions, self.current_version)
+        self._queries_model.select(self.current_query)
+        self._versions_model.select(self.current_version)
 
         self._lock_versions = False
 
-    def _select_in_list(self, listbox, value):
+    def _set_text(self, widget, value):
         """
-        Select the given value in the provided listbox, if present.
+        Replace the content of a Text widget, unless it already shows value
+        and has not been edited by the user since it was loaded.
+        Args:
+            widget: The Text widget to update.
+            value: The text to display.
         """
-        listbox.selection_clear(0, END)
-        if not value:
+        if self._text_shown.get(widget) == value and not widget.edit_modified():
             return
-        for i in range(listbox.size()):
-            if listbox.get(i) == value:
-                listbox.selection_set(i)
-                listbox.activate(i)
-                break
+        widget.delete("1.0", END)
+        if value:
+            widget.insert("1.0", value)
+        widget.edit_modified(False)
+        self._text_shown[widget] = value
+
+    def _get_text(self, widget):
+        """
+        Return the stripped content of a Text widget. When the user has not edited it
+        since _set_text loaded it, the loaded value is reused instead of reading the buffer back from Tk.
+        Args:
+            widget: The Text widget to read.
+        """
+        if widget in self._text_shown and not widget.edit_modified():
+            return self._text_shown[widget].strip()
+        # "end-1c" : sans le saut de ligne final que Tk ajoute toujours
+        return widget.get("1.0", "end-1c").strip()
+
+    def _schedule_refresh(self, categories=False, queries=False, versions=False, editor=False):
+        """
+        Mark parts of the UI as stale and refresh them once, when Tk is idle,
+        so that several mutations in a row repopulate each list only once.
+        """
+        self._dirty_categories |= categories
+        self._dirty_queries |= queries
+        self._dirty_versions |= versions
+        self._dirty_editor |= editor
+        if self._refresh_id is None:
+            self._refresh_id = self.after_idle(self._flush_refresh)
+
+    def _flush_refresh(self):
+        """
+        Run each pending refresh once, in dependency order.
+        """
+        self._refresh_id = None
+        categories, queries = self._dirty_categories, self._dirty_queries
+        versions, editor = self._dirty_versions, self._dirty_editor
+        self._dirty_categories = self._dirty_queries = False
+        self._dirty_versions = self._dirty_editor = False
+        if categories:
+            self._refresh_categories()
+        if queries:
+            self._refresh_queries()
+        if versions:
+            self._refresh_versions()
+        if editor:
+            self._refresh_editor()
+
+    def _load_version_fields(self, v):
+        """
+        Fill the version number, before and after fields from a version dictionary.
+        Args:
+            v: The version dictionary, or None to clear the fields.
+        """
+        if v:
+            self.var_version.set(v.get("version", ""))
+            self._set_text(self.text_before, v.get("before", ""))
+            self._set_text(self.text_after, v.get("after", ""))
+        else:
+            self.var_version.set("")
+            self._set_text(self.text_before, "")
+            self._set_text(self.text_after, "")
 
     # ------------------------------------------------------------------ #
     # Sélections
@@ -316,37 +440,53 @@ class QueriesUI(Frame):
 
     def _on_query_selected(self, event=None):
         """
-        Handler for selecting a query in the list. Updates version and editor.
+        Handler for selecting a query in the list. Updates version and editor
+        once the selection has settled (e.g. at the end of arrow-key navigation).
         """
+        if self._suspend_select:
+            return
         if event and event.widget is not self.list_queries:
             return
+        self._defer_selection("query", self._apply_query_selection)
 
+    def _apply_query_selection(self):
+        """
+        Apply the query currently selected in the list.
+        """
         sel = self.list_queries.curselection()
         if not sel:
             return
 
-        self.current_query = self.list_queries.get(sel[0])
+        self.current_query = self._queries_model.names[sel[0]]
 
         versions = self.manager.get_versions_for_query(self.current_query)
         self.current_version = versions[0] if versions else None
 
-        self._refresh_versions()
+        self._refresh_versions(versions)
         self._refresh_editor()
 
     def _on_version_selected(self, event=None):
         """
-        Handler for selecting a version in the list. Updates editor fields.
+        Handler for selecting a version in the list. Updates editor fields
+        once the selection has settled.
         """
         # Bloque les callbacks parasites
+        if self._suspend_select:
+            return
         if event and event.widget is not self.list_versions:
             return
+        self._defer_selection("version", self._apply_version_selection)
 
+    def _apply_version_selection(self):
+        """
+        Apply the version currently selected in the list.
+        """
         # Si l’événement vient d’ailleurs (sélection de fichier), on ignore
         if not self.list_versions.curselection():
             return
 
         sel = self.list_versions.curselection()
-        self.current_version = self.list_versions.get(sel[0])
+        self.current_version = self._versions_model.names[sel[0]]
 
         # Ici, on ne touche qu’aux champs de version, pas aux listes
         self._lock_versions = True
@@ -356,19 +496,28 @@ class QueriesUI(Frame):
         else:
             v = None
 
-        if v:
-            self.var_version.set(v.get("version", ""))
-            self.text_before.delete("1.0", END)
-            self.text_before.insert("1.0", v.get("before", ""))
-            self.text_after.delete("1.0", END)
-            self.text_after.insert("1.0", v.get("after", ""))
-        else:
-            self.var_version.set("")
-            self.text_before.delete("1.0", END)
-            self.text_after.delete("1.0", END)
+        self._load_version_fields(v)
 
         self._lock_versions = False
 
+    def _defer_selection(self, kind: str, apply):
+        """
+        Run apply() 30 ms after the last selection event of the given kind,
+        so that only the final position of a fast navigation is rendered.
+        Args:
+            kind: Which list the selection comes from ("query" or "version").
+            apply: Method reading the current selection and updating the UI.
+        """
+        after_id = self._selection_after.get(kind)
+        if after_id is not None:
+            self.after_cancel(after_id)
+
+        def run():
+            del self._selection_after[kind]
+            apply()
+
+        self._selection_after[kind] = self.after(30, run)
+
     # ------------------------------------------------------------------ #
     # Actions Catégories
     # ------------------------------------------------------------------ #
@@ -381,7 +530,7 @@ class QueriesUI(Frame):
         if not name:
             return
         self.manager.add_category(name)
-        self._refresh_categories()
+        self._schedule_refresh(categories=True)
 
     def _on_rename_category(self):
         """
@@ -390,12 +539,12 @@ class QueriesUI(Frame):
         sel = self.list_categories.curselection()
         if not sel:
             return
-        old = self.list_categories.get(sel[0])
+        old = self._categories_model.names[sel[0]]
         new = self._ask_string("Renommer catégorie", "Nouveau nom :", initial=old)
         if not new:
             return
         self.manager.rename_category(old, new)
-        self._refresh_categories()
+        self._schedule_refresh(categories=True)
 
     def _on_delete_category(self):
         """
@@ -404,11 +553,11 @@ class QueriesUI(Frame):
         sel = self.list_categories.curselection()
         if not sel:
             return
-        name = self.list_categories.get(sel[0])
+        name = self._categories_model.names[sel[0]]
         if not messagebox.askyesno("Supprimer", f"Supprimer la catégorie '{name}' ?"):
             return
         self.manager.delete_category(name)
-        self._refresh_categories()
+        self._schedule_refresh(categories=True)
 
     def _on_import_categories(self):
         """
@@ -417,8 +566,7 @@ class QueriesUI(Frame):
         path = filedialog.askopenfilename(title="Importer catégories", filetypes=[("JSON", "*.json")])
         if not path:
             return
-        self.manager.import_categories(path)
-        self._refresh_categories()
+        self._run_io(self.manager.import_categories, path, lambda: self._schedule_refresh(categories=True))
 
     def _on_export_categories(self):
         """
@@ -427,18 +575,20 @@ class QueriesUI(Frame):
         path = filedialog.asksaveasfilename(title="Exporter catégories", defaultextension=".json")
         if not path:
             return
-        self.manager.export_categories(path)
+        self._run_io(self.manager.export_categories, path)
 
     def _on_category_selected(self, event=None):
         """
         Handler for selecting a category in the list. Updates the category field.
         """
+        if self._suspend_select:
+            return
         if not self.current_query:
             return
         selection = self.list_categories.curselection()
         if not selection:
             return
-        category = self.list_categories.get(selection[0])
+        category = self._categories_model.names[selection[0]]
         self.var_category.set(category)
 
     # ------------------------------------------------------------------ #
@@ -455,9 +605,7 @@ class QueriesUI(Frame):
         self.manager.add_query(name)
         self.current_query = name
         self.current_version = None
-        self._refresh_queries()
-        self._refresh_versions()
-        self._refresh_editor()
+        self._schedule_refresh(queries=True, versions=True, editor=True)
 
     def _on_rename_query(self):
         """
@@ -472,12 +620,12 @@ class QueriesUI(Frame):
             old_name=self.current_query,
             new_name=new,
             category=self.var_category.get(),
-            description=self.text_description.get("1.0", END).strip(),
+            description=self._get_text(self.text_description),
             context_files=self.var_context_files.get(),
         )
+        self._max_version_per_query.pop(self.current_query, None)
         self.current_query = new
-        self._refresh_queries()
-        self._refresh_editor()
+        self._schedule_refresh(queries=True, editor=True)
 
     def _on_delete_query(self):
         """
@@ -488,11 +636,10 @@ class QueriesUI(Frame):
         if not messagebox.askyesno("Supprimer", f"Supprimer la requête '{self.current_query}' ?"):
             return
         self.manager.delete_query(self.current_query)
+        self._max_version_per_query.pop(self.current_query, None)
         self.current_query = None
         self.current_version = None
-        self._refresh_queries()
-        self._refresh_versions()
-        self._refresh_editor()
+        self._schedule_refresh(queries=True, versions=True, editor=True)
 
     def _on_import_queries(self):
         """
@@ -501,10 +648,14 @@ class QueriesUI(Frame):
         path = filedialog.askopenfilename(title="Importer requêtes", filetypes=[("JSON", "*.json")])
         if not path:
             return
-        self.manager.import_queries(path)
-        self._refresh_queries()
-        self._refresh_versions()
-        self._refresh_editor()
+        self._run_io(self.manager.import_queries, path, self._on_queries_imported)
+
+    def _on_queries_imported(self):
+        """
+        Completion of _on_import_queries, back on the Tk thread.
+        """
+        self._max_version_per_query.clear()
+        self._schedule_refresh(queries=True, versions=True, editor=True)
 
     def _on_export_queries(self):
         """
@@ -513,7 +664,7 @@ class QueriesUI(Frame):
         path = filedialog.asksaveasfilename(title="Exporter requêtes", defaultextension=".json")
         if not path:
             return
-        self.manager.export_queries(path)
+        self._run_io(self.manager.export_queries, path)
 
     def _on_memorize_query(self):
         """
@@ -550,29 +701,22 @@ class QueriesUI(Frame):
             messagebox.showerror("Erreur", "Sélectionnez une requête.")
             return
 
-        existing = self.manager.get_versions_for_query(self.current_query)
-
-        suggested = "001"
-        if existing:
-            nums = []
-            for v in existing:
-                try:
-                    nums.append(int(v))
-                except ValueError:
-                    pass
-            if nums:
-                suggested = f"{max(nums) + 1:03d}"
+        highest = self._max_version(self.current_query)
+        suggested = "001" if highest is None else f"{highest + 1:03d}"
 
         version = self._ask_string("Nouvelle version", "Numéro :", initial=suggested)
         if not version:
             return
 
         self.manager.add_version(self.current_query, version)
+        number = self._parse_version(version)
+        if number is not None and self.current_query in self._max_version_per_query:
+            highest = self._max_version_per_query[self.current_query]
+            self._max_version_per_query[self.current_query] = number if highest is None else max(highest, number)
         self.current_version = version
         self.var_version.set(version)
 
-        self._refresh_versions()
-        self._refresh_editor()
+        self._schedule_refresh(versions=True, editor=True)
 
     def _on_rename_version(self):
         """
@@ -583,8 +727,8 @@ class QueriesUI(Frame):
         new = self._ask_string("Renommer version", "Nouveau numéro :", initial=self.current_version)
         if not new:
             return
-        before = self.text_before.get("1.0", END).strip()
-        after = self.text_after.get("1.0", END).strip()
+        before = self._get_text(self.text_before)
+        after = self._get_text(self.text_after)
         self.manager.update_version(
             query_name=self.current_query,
             old_version=self.current_version,
@@ -592,9 +736,9 @@ class QueriesUI(Frame):
             before=before,
             after=after,
         )
+        self._max_version_per_query.pop(self.current_query, None)
         self.current_version = new
-        self._refresh_versions()
-        self._refresh_editor()
+        self._schedule_refresh(versions=True, editor=True)
 
     def _on_delete_version(self):
         """
@@ -605,9 +749,9 @@ class QueriesUI(Frame):
         if not messagebox.askyesno("Supprimer", f"Supprimer la version '{self.current_version}' ?"):
             return
         self.manager.delete_version(self.current_query, self.current_version)
+        self._max_version_per_query.pop(self.current_query, None)
         self.current_version = None
-        self._refresh_versions()
-        self._refresh_editor()
+        self._schedule_refresh(versions=True, editor=True)
 
     # ------------------------------------------------------------------ #
     # ENREGISTREMENT GLOBAL
@@ -624,36 +768,38 @@ class QueriesUI(Frame):
         old_name = self.current_query
         new_name = self.var_query_name.get().strip()
         category = self.var_category.get().strip()
-        description = self.text_description.get("1.0", END).strip()
+        description = self._get_text(self.text_description)
         context_files = self.var_context_files.get().strip()
 
-        self.manager.update_query_fields(
-            old_name=old_name,
-            new_name=new_name or old_name,
-            category=category,
-            description=description,
-            context_files=context_files,
-        )
-        self.current_query = new_name or old_name
-
         version_number = self.var_version.get().strip()
-        before = self.text_before.get("1.0", END).strip()
-        after = self.text_after.get("1.0", END).strip()
-
-        if version_number:
-            self.manager.update_version(
-                query_name=self.current_query,
-                old_version=self.current_version or version_number,
-                new_version=version_number,
-                before=before,
-                after=after,
+        before = self._get_text(self.text_before)
+        after = self._get_text(self.text_after)
+
+        self._max_version_per_query.pop(old_name, None)
+
+        # Une seule écriture disque pour la requête et sa version
+        with self.manager.batch():
+            self.manager.update_query_fields(
+                old_name=old_name,
+                new_name=new_name or old_name,
+                category=category,
+                description=description,
+                context_files=context_files,
             )
-            self.current_version = version_number
-            self.var_version.set(version_number)
+            self.current_query = new_name or old_name
 
-        self._refresh_queries()
-        self._refresh_versions()
-        self._refresh_editor()
+            if version_number:
+                self.manager.update_version(
+                    query_name=self.current_query,
+                    old_version=self.current_version or version_number,
+                    new_version=version_number,
+                    before=before,
+                    after=after,
+                )
+                self.current_version = version_number
+                self.var_version.set(version_number)
+
+        self._schedule_refresh(queries=True, versions=True, editor=True)
 
     # ------------------------------------------------------------------ #
     # GÉNÉRATION
@@ -702,6 +848,74 @@ class QueriesUI(Frame):
     # HELPERS
     # ------------------------------------------------------------------ #
 
+    def _run_io(self, func, path: str, on_done=None):
+        """
+        Run a manager import/export in a worker thread while an indeterminate progress bar
+        is shown, then call on_done() on the Tk thread. Errors are shown in a message box.
+        Args:
+            func: Manager method taking the file path (must not touch widgets).
+            path: File to import from or export to.
+            on_done: Optional callable run on the Tk thread after success.
+        """
+        if self._io_thread is not None:
+            messagebox.showinfo("Patientez", "Un import / export est déjà en cours.")
+            return
+        results = queue.Queue()
+
+        def work():
+            try:
+                func(path)
+            except Exception as e:
+                results.put(e)
+            else:
+                results.put(None)
+
+        self._io_thread = threading.Thread(target=work, name="QueriesUI-io", daemon=True)
+        self._io_thread.start()
+        self.progress.pack(side="bottom", fill="x", padx=5, pady=2, before=self._paned)
+        self.progress.start(10)
+        self.after(50, self._drain_io_queue, results, on_done)
+
+    def _drain_io_queue(self, results, on_done):
+        """
+        Poll the import/export worker from the Tk event loop (Tk is not thread-safe).
+        """
+        try:
+            error = results.get_nowait()
+        except queue.Empty:
+            self.after(50, self._drain_io_queue, results, on_done)
+            return
+        self._io_thread = None
+        self.progress.stop()
+        self.progress.pack_forget()
+        if error is not None:
+            messagebox.showerror("Erreur", str(error))
+            return
+        if on_done is not None:
+            on_done()
+
+    @staticmethod
+    def _parse_version(version: str):
+        """
+        Return the integer value of a version number, or None if it is not numeric.
+        """
+        try:
+            return int(version)
+        except ValueError:
+            return None
+
+    def _max_version(self, query: str):
+        """
+        Return the highest numeric version of a query (None if it has none),
+        scanning its versions only on the first call after a change.
+        Args:
+            query: Name of the query.
+        """
+        if query not in self._max_version_per_query:
+            nums = [n for n in map(self._parse_version, self.manager.get_versions_for_query(query)) if n is not None]
+            self._max_version_per_query[query] = max(nums) if nums else None
+        return self._max_version_per_query[query]
+
     def _ask_string(self, title: str, prompt: str, initial: str = ""):
         """
         Helper to show a string input dialog and return the result.
@@ -712,5 +926,4 @@ class QueriesUI(Frame):
         Returns:
             The string entered by the user, or None if cancelled.
         """
-        from tkinter.simpledialog import askstring
         return askstring(title, prompt, initialvalue=initial)
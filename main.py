@@ -1,8 +1,8 @@
-from tkinter import Tk
-from interface.ui import ApplicationUI
-
-
 def main():
+    # Tk et l'interface ne sont chargés qu'au lancement de l'application
+    from tkinter import Tk
+    from interface.ui import ApplicationUI
+
     root = Tk()
     app = ApplicationUI(root)
     root.mainloop()
@@ -1,6 +1,6 @@
 import os
-import subprocess
-from typing import List, Optional
+import sys
+from typing import List, Optional, Tuple
 from src.server_logic import ServerLogic
 
 
@@ -48,22 +48,29 @@ class ClientLogic:
         if os.name == "nt":  # Windows
             os.startfile(self.project_root)
         elif os.name == "posix":  # macOS / Linux
+            import subprocess
             subprocess.Popen(["open" if sys.platform == "darwin" else "xdg-open", self.project_root])
 
     # ---------- Extraction ----------
 
-    def extract_full_project(self) -> str:
+    def extract_full_project(self, server: Optional[ServerLogic] = None) -> str:
         """
         Scan, snapshot, and export the full project context. Sets the selected version.
+        Args:
+            server: Project to extract, captured by the caller before running in the
+                background. Defaults to the current project; the selected version is only
+                updated when the extracted project is still the current one.
         Returns:
             The version identifier of the new snapshot.
         """
-        if not self.server:
+        server = server or self.server
+        if not server:
             raise RuntimeError("Aucun projet sélectionné.")
-        snapshot = self.server.scan_project()
-        self.server.save_snapshot(snapshot)
-        self.server.export_full_context(snapshot)
-        self.selected_version = snapshot.version
+        snapshot = server.scan_project()
+        server.save_snapshot(snapshot)
+        server.export_full_context(snapshot)
+        if server is self.server:
+            self.selected_version = snapshot.version
         return snapshot.version
 
     # ---------- Versions ----------
@@ -114,34 +121,68 @@ class ClientLogic:
 
     # ---------- Export sélection ----------
 
-    def export_selected_markdown_and_html(self) -> None:
+    def export_selected_markdown_and_html(
+        self,
+        server: Optional[ServerLogic] = None,
+        version: Optional[str] = None,
+        files: Optional[List[str]] = None,
+    ) -> None:
         """
         Export the selected files as Markdown and HTML context files.
+        The project, version and files default to the current state; background
+        callers pass the values captured when the action was requested.
         """
-        if not self.server or not self.selected_version:
+        server, version, files = self._resolve(server, version, files)
+        if not server or not version:
             return
-        snapshot = self.server.load_snapshot(self.selected_version)
-        self.server.export_selected_context(snapshot, self.selected_files)
+        snapshot = server.load_snapshot(version)
+        server.export_selected_context(snapshot, files)
 
     # ---------- Restauration ----------
 
-    def restore_full_version(self) -> None:
+    def restore_full_version(self, server: Optional[ServerLogic] = None, version: Optional[str] = None) -> None:
         """
         Restore all files from the currently selected version to the project directory.
+        The project and version default to the current state (see export_selected_markdown_and_html).
         """
-        if not self.server or not self.selected_version:
+        server, version, _ = self._resolve(server, version, None)
+        if not server or not version:
             return
-        snapshot = self.server.load_snapshot(self.selected_version)
-        self.server.restore_all(snapshot)
+        snapshot = server.load_snapshot(version)
+        server.restore_all(snapshot)
 
-    def restore_selected_files(self) -> None:
+    def restore_selected_files(
+        self,
+        server: Optional[ServerLogic] = None,
+        version: Optional[str] = None,
+        files: Optional[List[str]] = None,
+    ) -> None:
         """
         Restore only the selected files from the current version to the project directory.
+        The project, version and files default to the current state (see export_selected_markdown_and_html).
         """
-        if not self.server or not self.selected_version:
+        server, version, files = self._resolve(server, version, files)
+        if not server or not version:
             return
-        snapshot = self.server.load_snapshot(self.selected_version)
-        self.server.restore_selected(snapshot, self.selected_files)
+        snapshot = server.load_snapshot(version)
+        server.restore_selected(snapshot, files)
+
+    def _resolve(
+        self,
+        server: Optional[ServerLogic],
+        version: Optional[str],
+        files: Optional[List[str]],
+    ) -> Tuple[Optional[ServerLogic], Optional[str], List[str]]:
+        """
+        Fill in the project, version and file selection not given explicitly from the current state.
+        """
+        if server is None:
+            server = self.server
+        if version is None:
+            version = self.selected_version
+        if files is None:
+            files = self.selected_files
+        return server, version, files
 
     def memorize_query_and_version(self, query, version):
         self.memo_query = query
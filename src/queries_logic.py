@@ -1,7 +1,6 @@
 import os
-import webbrowser
-from typing import List, Dict, Callable, Optional
-import subprocess
+from functools import lru_cache
+from typing import List, Dict, Callable, Optional, Tuple
 
 
 from data.queries_manager import QueriesManager
@@ -13,6 +12,53 @@ This class is responsible for constructing prompts for Copilot (GitHub/Edge), ha
 It does not access UI state directly and is orchestrated by ClientLogic. All UI dependencies are injected via callbacks.
 """
 
+# Contextes générés, relatifs au dossier du projet
+_CONTEXT_HTML_REL = os.path.join("code_source", "selected_context.html")
+_CONTEXT_MD_REL = os.path.join("code_source", "selected_context.md")
+
+# Nombre maximal de prompts mémorisés par cible
+_PROMPT_CACHE_SIZE = 32
+
+
+@lru_cache(maxsize=1)
+def _edge_command() -> List[str]:
+    """
+    Return the command prefix used to open a file in Edge, resolved once per process.
+    Launches msedge directly when it is on PATH, otherwise through a single cmd "start".
+    """
+    import shutil
+    edge = shutil.which("msedge")
+    if edge:
+        return [edge]
+    return ["cmd", "/c", "start", "msedge.exe"]
+
+
+@lru_cache(maxsize=1)
+def _html_opens_in_edge() -> bool:
+    """
+    Return True if .html files open in Edge by default (Windows only), probed once per process.
+    """
+    if os.name != "nt":
+        return False
+    try:
+        import winreg
+        with winreg.OpenKey(
+            winreg.HKEY_CURRENT_USER,
+            r"Software\Microsoft\Windows\CurrentVersion\Explorer\FileExts\.html\UserChoice",
+        ) as key:
+            prog_id, _ = winreg.QueryValueEx(key, "ProgId")
+    except OSError:
+        return False
+    return str(prog_id).startswith("MSEdge")
+
+
+def _remember(cache: Dict, key, text: str) -> None:
+    """Store a built prompt, dropping the oldest entry once the cache is full."""
+    if len(cache) >= _PROMPT_CACHE_SIZE:
+        del cache[next(iter(cache))]
+    cache[key] = text
+
+
 class QueriesLogic:
     """
     Backend logic for prompt/query management and Copilot integration.
@@ -40,21 +86,27 @@ class QueriesLogic:
         # Determine base path for context files (default: project root)
         # if base_path is None:
         #     base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        # The setter also computes the paths to the generated context files
         self.base_path = base_path or os.getcwd()
 
-        # Paths to generated context files (HTML and Markdown)
-        self.context_html_path = os.path.join(
-            self.base_path,
-            "code_source",
-            "selected_context.html",
-        )
+        # Prompts déjà construits, indexés sur le texte source (et les fichiers pour GitHub) :
+        # la clé porte tout ce dont dépend le prompt, aucune invalidation nécessaire
+        self._edge_cache: Dict[Tuple[str, str], str] = {}
+        self._github_cache: Dict[Tuple[str, str, Tuple[str, ...]], str] = {}
 
-        self.context_md_path = os.path.join(
-            self.base_path,
-            "code_source",
-            "selected_context.md",
-        )
 
+    @property
+    def base_path(self) -> str:
+        """Base directory holding the code_source folder with the context files."""
+        return self._base_path
+
+    @base_path.setter
+    def base_path(self, path: str) -> None:
+        # Chemins des contextes calculés une fois par changement de projet
+        # (ClientLogic.select_project réaffecte base_path)
+        self._base_path = path
+        self.context_html_path = os.path.join(path, _CONTEXT_HTML_REL)
+        self.context_md_path = os.path.join(path, _CONTEXT_MD_REL)
 
     # ---------- Prompt Construction Methods ----------
 
@@ -68,8 +120,12 @@ class QueriesLogic:
         Returns:
             The full prompt string for Edge Copilot.
         """
-        before = version.get("before", "").strip()
-        after = version.get("after", "").strip()
+        key = (version.get("before", ""), version.get("after", ""))
+        text = self._edge_cache.get(key)
+        if text is not None:
+            return text
+        before = key[0].strip()
+        after = key[1].strip()
 
         # Always include a context block for Edge Copilot
         context_block = (
@@ -77,7 +133,9 @@ class QueriesLogic:
         )
 
         parts = [p for p in [before, context_block, after] if p]
-        return "\n\n".join(parts)
+        text = "\n\n".join(parts)
+        _remember(self._edge_cache, key, text)
+        return text
 
     def build_github_query(self, query: Dict, version: Dict) -> str:
         """
@@ -89,10 +147,14 @@ class QueriesLogic:
         Returns:
             The full prompt string for GitHub Copilot.
         """
-        before = version.get("before", "").strip()
-        after = version.get("after", "").strip()
+        selected_files = tuple(self.get_selected_files())
+        key = (version.get("before", ""), version.get("after", ""), selected_files)
+        text = self._github_cache.get(key)
+        if text is not None:
+            return text
+        before = key[0].strip()
+        after = key[1].strip()
 
-        selected_files = self.get_selected_files()
         # Build a context block listing all selected files, or a placeholder if none
         if selected_files:
             context_lines = [f"@{path}" for path in selected_files]
@@ -101,7 +163,9 @@ class QueriesLogic:
             context_block = "Context files: (no files selected)"
 
         parts = [p for p in [before, context_block, after] if p]
-        return "\n\n".join(parts)
+        text = "\n\n".join(parts)
+        _remember(self._github_cache, key, text)
+        return text
 
     # ---------- Context File and Copilot Actions ----------
 
@@ -112,16 +176,30 @@ class QueriesLogic:
         Open the generated HTML and Markdown context files in the default browser and Edge (if available).
         Used for Edge Copilot context visualization. Opens HTML in default browser, and tries to open MD in Edge.
         """
+        # webbrowser et subprocess ne servent qu'ici : importés au premier clic
+        import subprocess
+        import webbrowser
+
+        html_exists = os.path.exists(self.context_html_path)
+        md_exists = os.path.exists(self.context_md_path)
+
+        # Edge est déjà le navigateur par défaut : un seul lancement ouvre les deux onglets
+        if html_exists and md_exists and _html_opens_in_edge():
+            try:
+                subprocess.Popen(_edge_command() + [self.context_html_path, self.context_md_path])
+                return
+            except Exception as e:
+                print("Erreur ouverture du contexte dans Edge:", e)
+
         # Open HTML in default browser
-        if os.path.exists(self.context_html_path):
+        if html_exists:
             webbrowser.open(self.context_html_path)
 
         # Try to open Markdown in Edge (Windows only)
-        if os.path.exists(self.context_md_path):
+        if md_exists:
             try:
-                subprocess.Popen([
-                    "cmd", "/c", "start", "msedge.exe", self.context_md_path
-                ], shell=True)
+                # Sans shell=True : pas de cmd.exe intermédiaire en plus de "start"
+                subprocess.Popen(_edge_command() + [self.context_md_path])
             except Exception as e:
                 print("Erreur ouverture MD dans Edge:", e)
 
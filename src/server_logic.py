@@ -1,17 +1,246 @@
 import os
-from typing import List, Dict, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 from data.models import ProjectPaths, ExclusionRules, ProjectSnapshot
 from data.utils import (
+    msgpack,
+    lz4,
+    LZ4_SUFFIX,
+    lz4_enabled,
     save_json,
+    save_json_stream,
     load_json,
-    generate_markdown,
-    generate_html,
+    save_json_compressed,
+    load_json_compressed,
+    save_msgpack,
+    load_msgpack,
+    write_markdown,
+    write_html,
     get_next_version_number,
     list_existing_versions,
+    invalidate_versions_cache,
     delete_version_files,
 )
 
 
+def _load_files_content(paths: ProjectPaths, version: str) -> Dict[str, str]:
+    """
+    Load the file contents of a version from whichever supported format is on disk.
+    Args:
+        paths: Paths of the project.
+        version: Version identifier to load.
+    Returns:
+        Mapping of relative path to file content.
+    """
+    fc_json = paths.files_content_json(version)
+    candidates = []
+    if msgpack is not None:
+        fc_msgpack = paths.files_content_msgpack(version)
+        if lz4 is not None:
+            candidates.append((fc_msgpack + LZ4_SUFFIX, load_msgpack))
+        candidates.append((fc_msgpack, load_msgpack))
+    if lz4 is not None:
+        candidates.append((fc_json + LZ4_SUFFIX, load_json_compressed))
+    for path, loader in candidates:
+        if os.path.exists(path):
+            return loader(path)
+    return load_json(fc_json)
+
+
+# Une seule entrée : la limite mémoire des aperçus est portée par le cache de l'UI
+# (SNAPSHOT_CACHE_MAX_BYTES) ; ici on garde seulement le dernier snapshot, que les
+# exports / restaurations qui suivent une consultation relisent aussitôt.
+@lru_cache(maxsize=1)
+def load_snapshot_cached(paths: ProjectPaths, version: str, mtime_ns: int) -> ProjectSnapshot:
+    """
+    Load a snapshot from disk, memoized on (project paths, version, organisation file mtime).
+    A rewritten snapshot gets a new mtime and therefore a new cache entry.
+    The returned snapshot is shared: callers must not mutate it.
+    Args:
+        paths: Paths of the project.
+        version: Version identifier to load.
+        mtime_ns: st_mtime_ns of the version's organisation JSON.
+    Returns:
+        ProjectSnapshot for the given version.
+    """
+    org = load_json(paths.organisation_json(version))
+    fc = _load_files_content(paths, version)
+    return ProjectSnapshot(version=version, organisation=org, files_content=fc)
+
+
+def _walk_project(
+    root: str, should_exclude: Callable[[str], bool]
+) -> Iterator[Tuple[str, List[str], List[Tuple[str, str]]]]:
+    """
+    Walk a project tree top-down with os.scandir, dropping excluded names before any stat.
+    Visits directories in the same order as os.walk; symlinked directories are listed
+    but not followed, and unreadable directories are skipped.
+    Args:
+        root: Project root directory.
+        should_exclude: Predicate on a file or directory name.
+    Yields:
+        (rel_root, dirs, files): the directory path relative to root ("" for root),
+        its kept sub-directory names, and its kept files as (name, absolute path) pairs.
+    """
+    stack = [("", root)]
+    while stack:
+        rel_root, abs_root = stack.pop()
+        try:
+            with os.scandir(abs_root) as it:
+                entries = list(it)
+        except OSError:
+            continue
+        dirs: List[str] = []
+        files: List[Tuple[str, str]] = []
+        subdirs = []
+        for entry in entries:
+            name = entry.name
+            if should_exclude(name):
+                continue
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+            if not is_dir:
+                files.append((name, entry.path))
+                continue
+            dirs.append(name)
+            try:
+                is_link = entry.is_symlink()
+            except OSError:
+                is_link = False
+            if not is_link:
+                subdirs.append((rel_root + os.sep + name if rel_root else name, entry.path))
+        yield rel_root, dirs, files
+        # Pile LIFO : on empile à l'envers pour garder l'ordre de parcours d'os.walk
+        stack.extend(reversed(subdirs))
+
+
+# Lectures de fichiers en parallèle : les E/S relâchent le GIL
+_READ_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+
+_UNREADABLE = "<< Impossible de lire ce fichier >>"
+_READ_FLAGS = os.O_RDONLY | getattr(os, "O_BINARY", 0)
+_READ_CHUNK = 1 << 16
+
+# Au-delà de cette taille, seuls les fichiers d'extension texte connue sont lus
+MAX_UNKNOWN_FILE_BYTES = 512 * 1024
+TEXT_EXTENSIONS = frozenset({
+    ".py", ".pyi", ".pyw", ".txt", ".md", ".rst", ".json", ".toml", ".cfg", ".ini",
+    ".yaml", ".yml", ".xml", ".html", ".htm", ".css", ".scss", ".js", ".jsx", ".ts",
+    ".tsx", ".vue", ".c", ".h", ".cpp", ".hpp", ".cc", ".cs", ".java", ".kt", ".go",
+    ".rs", ".rb", ".php", ".sh", ".bat", ".ps1", ".sql", ".csv", ".tex", ".spec",
+})
+
+
+def _read_text(path: str) -> Optional[str]:
+    """
+    Read a project file as text, ignoring undecodable bytes.
+    Newlines are translated as open() in text mode would.
+    Binary files (NUL byte in the first chunk) and files larger than
+    MAX_UNKNOWN_FILE_BYTES without a known text extension are skipped.
+    Args:
+        path: Absolute path of the file.
+    Returns:
+        The file content, None if the file is skipped, or a placeholder if it cannot be read.
+    """
+    # os.open/os.read : ni objet fichier ni TextIOWrapper, moins d'appels système par fichier
+    try:
+        fd = os.open(path, _READ_FLAGS)
+        try:
+            size = os.fstat(fd).st_size
+            if size > MAX_UNKNOWN_FILE_BYTES and os.path.splitext(path)[1].lower() not in TEXT_EXTENSIONS:
+                return None
+            # Lecture dimensionnée sur st_size : un seul read, sans copie de concaténation
+            data = os.read(fd, size + 1)
+            if data.find(b"\0", 0, _READ_CHUNK) != -1:
+                return None
+            if len(data) != size:
+                # Fichier modifié depuis le fstat, ou taille non fiable : lire jusqu'à la fin
+                chunks = [data]
+                while True:
+                    chunk = os.read(fd, _READ_CHUNK)
+                    if not chunk:
+                        break
+                    chunks.append(chunk)
+                data = b"".join(chunks)
+        finally:
+            os.close(fd)
+        text = data.decode("utf-8", errors="ignore")
+    except OSError:
+        return _UNREADABLE
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
+
+
+# Signature d'un fichier pour la réutilisation entre deux scans : (st_mtime_ns, st_size)
+_FileKey = Tuple[int, int]
+
+
+def _read_if_changed(
+    previous: Dict[str, Tuple[_FileKey, Optional[str]]], path: str
+) -> Tuple[Optional[_FileKey], Optional[str]]:
+    """
+    Read a project file unless it is unchanged since the previous scan.
+    Args:
+        previous: Absolute path -> (file key, content) recorded by the previous scan.
+        path: Absolute path of the file.
+    Returns:
+        (key, content): the file's (mtime_ns, size), or None if it cannot be stat'ed,
+        and its content as returned by _read_text.
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None, _read_text(path)
+    key = (st.st_mtime_ns, st.st_size)
+    cached = previous.get(path)
+    if cached is not None and cached[0] == key:
+        return key, cached[1]
+    return key, _read_text(path)
+
+
+_WRITE_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+
+
+def _write_text(path: str, content: str) -> None:
+    """
+    Write a restored file, with the newline translation open() in text mode would apply.
+    Args:
+        path: Absolute path of the file.
+        content: Text to write, encoded as UTF-8.
+    """
+    if os.linesep != "\n":
+        content = content.replace("\n", os.linesep)
+    # Encodage en une fois puis os.write : pas de TextIOWrapper par fichier
+    view = memoryview(content.encode("utf-8"))
+    fd = os.open(path, _WRITE_FLAGS, 0o666)
+    try:
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+
+def _write_exports(md_path: str, html_path: str, snapshot: ProjectSnapshot) -> None:
+    """
+    Write the Markdown and HTML exports of a snapshot concurrently: the HTML file
+    is rendered in a helper thread while the Markdown one is rendered here, so
+    their disk writes overlap.
+    Args:
+        md_path: Destination of the Markdown export.
+        html_path: Destination of the HTML export.
+        snapshot: The snapshot to export.
+    """
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        html_done = pool.submit(write_html, html_path, snapshot)
+        write_markdown(md_path, snapshot)
+        html_done.result()
+
+
 class ServerLogic:
     """
     Handles all backend operations for project file management, versioning, context export, and restoration.
@@ -25,6 +254,11 @@ class ServerLogic:
         """
         self.paths = ProjectPaths(project_root)
         self.exclusions = ExclusionRules()
+        # Résultat du dernier scan (chemin absolu -> (signature, contenu)) : les fichiers
+        # dont la signature n'a pas changé ne sont pas relus au scan suivant
+        self._last_scan: Dict[str, Tuple[_FileKey, Optional[str]]] = {}
+        # Signature de exclude.txt au dernier chargement : inchangée, pas de relecture
+        self._exclusions_signature: Optional[_FileKey] = None
         self._ensure_code_source()
 
     # ---------- Initialisation / exclusions ----------
@@ -41,14 +275,23 @@ class ServerLogic:
     def load_exclusions(self) -> None:
         """
         Load custom exclusion rules from the exclusion file into the ExclusionRules object.
+        The file is only parsed again when its mtime or size changed since the last load.
         """
+        try:
+            st = os.stat(self.paths.exclude_file)
+            signature: Optional[_FileKey] = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            signature = None
+        if signature is not None and signature == self._exclusions_signature:
+            return
+        self._exclusions_signature = signature
         self.exclusions.custom.clear()
-        if os.path.exists(self.paths.exclude_file):
+        if signature is not None:
             with open(self.paths.exclude_file, "r", encoding="utf-8") as f:
-                for line in f:
-                    line = line.strip()
-                    if line:
-                        self.exclusions.custom.add(line)
+                lines = f.read().split("\n")
+            # Une seule lecture, strip et filtrage des lignes vides côté C
+            self.exclusions.custom.update(filter(None, map(str.strip, lines)))
+        self.exclusions.invalidate()
 
     # ---------- Scan / snapshot ----------
 
@@ -60,57 +303,73 @@ class ServerLogic:
         """
         self.load_exclusions()
         organisation: Dict[str, Dict[str, List[str]]] = {}
-        files_content: Dict[str, str] = {}
-
-        for current_root, dirs, files in os.walk(self.paths.root):
-            rel_root = os.path.relpath(current_root, self.paths.root)
-            if rel_root == ".":
-                rel_root = ""
-
-            # Exclude directories as needed
-            dirs[:] = [d for d in dirs if not self.exclusions.should_exclude(d)]
+        rel_paths: List[str] = []
+        abs_paths: List[str] = []
 
+        # Un seul scandir par dossier, exclusions appliquées avant tout stat
+        for rel_root, dirs, files in _walk_project(self.paths.root, self.exclusions.matcher()):
             organisation[rel_root] = {
-                "dirs": dirs.copy(),
-                "files": [f for f in files if not self.exclusions.should_exclude(f)],
+                "dirs": dirs,
+                "files": [f for f, _ in files],
             }
 
-            for f in files:
-                if self.exclusions.should_exclude(f):
-                    continue
-                rel_path = os.path.join(rel_root, f) if rel_root else f
-                file_path = os.path.join(current_root, f)
-                try:
-                    with open(file_path, "r", encoding="utf-8", errors="ignore") as fp:
-                        files_content[rel_path] = fp.read()
-                except Exception:
-                    files_content[rel_path] = "<< Impossible de lire ce fichier >>"
-
-        version = get_next_version_number(self.paths.code_source)
+            prefix = rel_root + os.sep if rel_root else ""
+            for f, file_path in files:
+                rel_paths.append(prefix + f)
+                abs_paths.append(file_path)
+
+        # Parcours séquentiel, lectures en parallèle ; map() conserve l'ordre du parcours.
+        # Les fichiers binaires ou trop gros restent listés dans l'organisation mais n'ont
+        # pas de contenu : une restauration ne les écrasera jamais.
+        files_content: Dict[str, str] = {}
+        scanned: Dict[str, Tuple[_FileKey, Optional[str]]] = {}
+        read = partial(_read_if_changed, self._last_scan)
+        with ThreadPoolExecutor(max_workers=_READ_WORKERS) as pool:
+            for rel_path, abs_path, (key, text) in zip(rel_paths, abs_paths, pool.map(read, abs_paths)):
+                if key is not None and text is not _UNREADABLE:
+                    scanned[abs_path] = (key, text)
+                if text is not None:
+                    files_content[rel_path] = text
+        self._last_scan = scanned
+
+        version = get_next_version_number(self.paths.code_source, self.list_versions())
         return ProjectSnapshot(version=version, organisation=organisation, files_content=files_content)
 
     # ---------- Sauvegarde / chargement snapshot ----------
 
     def save_snapshot(self, snapshot: ProjectSnapshot) -> None:
         """
-        Save a project snapshot to disk as JSON files (organisation and file contents).
+        Save a project snapshot to disk: organisation as JSON, file contents as
+        MessagePack when available (JSON otherwise), LZ4-compressed if LZ4_ENABLED is set.
         Args:
             snapshot: The ProjectSnapshot to save.
         """
-        save_json(self.paths.organisation_json(snapshot.version), snapshot.organisation)
-        save_json(self.paths.files_content_json(snapshot.version), snapshot.files_content)
+        version = snapshot.version
+        save_json(self.paths.organisation_json(version), snapshot.organisation)
+        compress = lz4_enabled()
+        # Contenu des fichiers en MessagePack si disponible (pas d'échappement JSON)
+        if msgpack is not None:
+            path = self.paths.files_content_msgpack(version)
+            save_msgpack(path + LZ4_SUFFIX if compress else path, snapshot.files_content, compress)
+        elif compress:
+            save_json_compressed(self.paths.files_content_json(version) + LZ4_SUFFIX, snapshot.files_content)
+        else:
+            save_json_stream(self.paths.files_content_json(version), snapshot.files_content)
+        invalidate_versions_cache(self.paths.code_source)
+        # mtime à résolution grossière : ne pas risquer de resservir l'ancien contenu
+        load_snapshot_cached.cache_clear()
 
     def load_snapshot(self, version: str) -> ProjectSnapshot:
         """
         Load a project snapshot from disk for a given version.
+        The last loaded snapshot is served from memory while its files are unchanged.
         Args:
             version: Version identifier to load.
         Returns:
             ProjectSnapshot for the given version.
         """
-        org = load_json(self.paths.organisation_json(version))
-        fc = load_json(self.paths.files_content_json(version))
-        return ProjectSnapshot(version=version, organisation=org, files_content=fc)
+        mtime_ns = os.stat(self.paths.organisation_json(version)).st_mtime_ns
+        return load_snapshot_cached(self.paths, version, mtime_ns)
 
     # ---------- Exports ----------
 
@@ -120,12 +379,7 @@ class ServerLogic:
         Args:
             snapshot: The ProjectSnapshot to export.
         """
-        md = generate_markdown(snapshot)
-        html = generate_html(snapshot)
-        with open(self.paths.context_md, "w", encoding="utf-8") as f:
-            f.write(md)
-        with open(self.paths.context_html, "w", encoding="utf-8") as f:
-            f.write(html)
+        _write_exports(self.paths.context_md, self.paths.context_html, snapshot)
 
     def export_selected_context(self, snapshot: ProjectSnapshot, selected_files: List[str]) -> None:
         """
@@ -136,12 +390,7 @@ class ServerLogic:
         """
         from data.utils import filter_snapshot
         filtered = filter_snapshot(snapshot, selected_files)
-        md = generate_markdown(filtered)
-        html = generate_html(filtered)
-        with open(self.paths.selected_context_md, "w", encoding="utf-8") as f:
-            f.write(md)
-        with open(self.paths.selected_context_html, "w", encoding="utf-8") as f:
-            f.write(html)
+        _write_exports(self.paths.selected_context_md, self.paths.selected_context_html, filtered)
 
     # ---------- Versioning ----------
 
@@ -160,20 +409,42 @@ class ServerLogic:
             version: Version identifier to delete.
         """
         delete_version_files(self.paths.code_source, version)
+        # Ne pas garder en mémoire le snapshot décodé d'une version supprimée
+        load_snapshot_cached.cache_clear()
 
     # ---------- Restauration ----------
 
+    def _restore_files(self, files: Iterable[Tuple[str, str]]) -> None:
+        """
+        Write (relative path, content) pairs under the project root.
+        Each parent directory is created once, and the files are written in parallel.
+        Args:
+            files: The files to restore.
+        """
+        root = self.paths.root
+        made = set()
+        abs_paths: List[str] = []
+        contents: List[str] = []
+        for rel_path, content in files:
+            abs_path = os.path.join(root, rel_path)
+            parent = os.path.dirname(abs_path)
+            if parent not in made:
+                os.makedirs(parent, exist_ok=True)
+                made.add(parent)
+            abs_paths.append(abs_path)
+            contents.append(content)
+        # Les écritures relâchent le GIL, comme les lectures du scan
+        with ThreadPoolExecutor(max_workers=_READ_WORKERS) as pool:
+            for _ in pool.map(_write_text, abs_paths, contents):
+                pass
+
     def restore_all(self, snapshot: ProjectSnapshot) -> None:
         """
         Restore all files from a snapshot to the project directory.
         Args:
             snapshot: The ProjectSnapshot to restore.
         """
-        for rel_path, content in snapshot.files_content.items():
-            abs_path = os.path.join(self.paths.root, rel_path)
-            os.makedirs(os.path.dirname(abs_path), exist_ok=True)
-            with open(abs_path, "w", encoding="utf-8") as f:
-                f.write(content)
+        self._restore_files(snapshot.files_content.items())
 
     def restore_selected(self, snapshot: ProjectSnapshot, selected_files: List[str]) -> None:
         """
@@ -182,11 +453,9 @@ class ServerLogic:
             snapshot: The ProjectSnapshot to restore from.
             selected_files: List of file paths to restore.
         """
-        selected_set = set(selected_files)
-        for rel_path, content in snapshot.files_content.items():
-            if rel_path not in selected_set:
-                continue
-            abs_path = os.path.join(self.paths.root, rel_path)
-            os.makedirs(os.path.dirname(abs_path), exist_ok=True)
-            with open(abs_path, "w", encoding="utf-8") as f:
-                f.write(content)
\ No newline at end of file
+        files_content = snapshot.files_content
+        self._restore_files(
+            (rel_path, files_content[rel_path])
+            for rel_path in dict.fromkeys(selected_files)
+            if rel_path in files_content
+        )